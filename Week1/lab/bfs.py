@@ -1,54 +1,30 @@
-from collections import deque
+import argparse
+import os
+import sys
 
-def is_valid(state):
-    missionaries, cannibals, boat = state
-    if missionaries < 0 or cannibals < 0 or missionaries > 3 or cannibals > 3:
-        return False
-    if missionaries > 0 and missionaries < cannibals:
-        return False
-    if 3 - missionaries > 0 and 3 - missionaries < 3 - cannibals:
-        return False
-    return True
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from common.stats import SearchStats
+from river_crossing import RiverCrossing
 
-def get_successors(state):
-    successors = []
-    missionaries, cannibals, boat = state
-    if boat == 1:
-        moves = [(2, 0), (0, 2), (1, 1), (1, 0), (0, 1)]
-        for move in moves:
-            new_state = (missionaries - move[0], cannibals - move[1], 0)
-            if is_valid(new_state):
-                successors.append(new_state)
-    else:
-        moves = [(2, 0), (0, 2), (1, 1), (1, 0), (0, 1)]
-        for move in moves:
-            new_state = (missionaries + move[0], cannibals + move[1], 1)
-            if is_valid(new_state):
-                successors.append(new_state)
-    return successors
-
-def bfs(start_state, goal_state):
-    queue = deque([(start_state, [])])
-    visited = set()
-    while queue:
-        (state, path) = queue.popleft()
-        if state in visited:
-            continue
-        visited.add(state)
-        path = path + [state]
-        if state == goal_state:
-            return path
-        for successor in get_successors(state):
-            queue.append((successor, path))
-    return None
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Missionaries and cannibals (BFS)")
+    parser.add_argument('--missionaries', type=int, default=3)
+    parser.add_argument('--cannibals', type=int, default=3)
+    parser.add_argument('--capacity', type=int, default=2, help="people the boat can carry")
+    parser.add_argument('--stats', choices=['text', 'json'], default=None, help="print search statistics")
+    args = parser.parse_args()
 
-start_state = (3, 3, 1)
-goal_state = (0, 0, 0)
+    problem = RiverCrossing(args.missionaries, args.cannibals, args.capacity)
+    start_state = (args.missionaries, args.cannibals, 1)
+    goal_state = (0, 0, 0)
 
-solution = bfs(start_state, goal_state)
-if solution:
-    print("Solution found:")
-    for step in solution:
-        print(step)
-else:
-    print("No solution found.")
\ No newline at end of file
+    stats = SearchStats('bfs') if args.stats else None
+    solution = problem.solve(start_state, goal_state, stats)
+    if solution:
+        print("Solution found:")
+        for step in solution:
+            print(step)
+    else:
+        print("No solution found.")
+    if stats is not None:
+        print(stats.report(args.stats))
@@ -1,54 +1,27 @@
-from collections import deque
+import argparse
+import os
+import sys
 
-def is_valid(state):
-    missionaries, cannibals, boat = state
-    if missionaries < 0 or cannibals < 0 or missionaries > 3 or cannibals > 3:
-        return False
-    if missionaries > 0 and missionaries < cannibals:
-        return False
-    if 3 - missionaries > 0 and 3 - missionaries < 3 - cannibals:
-        return False
-    return True
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from common.search import dfs
+from common.stats import SearchStats
+from river_crossing import get_successors
 
-def get_successors(state):
-    successors = []
-    missionaries, cannibals, boat = state
-    if boat == 1:  # Boat on the left side
-        moves = [(2, 0), (0, 2), (1, 1), (1, 0), (0, 1)]
-        for move in moves:
-            new_state = (missionaries - move[0], cannibals - move[1], 0)
-            if is_valid(new_state):
-                successors.append(new_state)
-    else:  # Boat on the right side
-        moves = [(2, 0), (0, 2), (1, 1), (1, 0), (0, 1)]
-        for move in moves:
-            new_state = (missionaries + move[0], cannibals + move[1], 1)
-            if is_valid(new_state):
-                successors.append(new_state)
-    return successors
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Missionaries and cannibals (DFS)")
+    parser.add_argument('--stats', choices=['text', 'json'], default=None, help="print search statistics")
+    args = parser.parse_args()
 
-def dfs(start_state, goal_state):
-    stack = [(start_state, [])]
-    visited = set()
-    while stack:
-        (state, path) = stack.pop()
-        if state in visited:
-            continue
-        visited.add(state)
-        path = path + [state]
-        if state == goal_state:
-            return path
-        for successor in get_successors(state):
-            stack.append((successor, path))
-    return None
+    start_state = (3, 3, 1)
+    goal_state = (0, 0, 0)
 
-start_state = (3, 3, 1)
-goal_state = (0, 0, 0)
-
-solution = dfs(start_state, goal_state)
-if solution:
-    print("Solution found:")
-    for step in solution:
-        print(step)
-else:
-    print("No solution found.")
+    stats = SearchStats('dfs') if args.stats else None
+    solution = dfs(start_state, get_successors, lambda state: state == goal_state, stats)
+    if solution:
+        print("Solution found:")
+        for step in solution:
+            print(step)
+    else:
+        print("No solution found.")
+    if stats is not None:
+        print(stats.report(args.stats))
@@ -0,0 +1,121 @@
+from array import array
+from functools import lru_cache
+
+# Missionaries and cannibals with any number of people and any boat size.
+#
+# A state is (missionaries on the left bank, cannibals on the left bank,
+# boat) with boat == 1 when the boat is on the left. Cannibals may never
+# outnumber the missionaries on a bank that has missionaries on it.
+
+
+@lru_cache(maxsize=None)
+def boat_moves(capacity):
+    """Every (missionaries, cannibals) load the boat can carry, largest first."""
+    moves = [(m, c) for m in range(capacity + 1) for c in range(capacity + 1 - m) if m + c > 0]
+    moves.sort(key=lambda move: (-(move[0] + move[1]), -move[0]))
+    return tuple(moves)
+
+
+def is_valid(state, missionaries=3, cannibals=3):
+    left_m, left_c, boat = state
+    if left_m < 0 or left_c < 0 or left_m > missionaries or left_c > cannibals:
+        return False
+    if left_m > 0 and left_m < left_c:
+        return False
+    if missionaries - left_m > 0 and missionaries - left_m < cannibals - left_c:
+        return False
+    return True
+
+
+def get_successors(state, missionaries=3, cannibals=3, capacity=2):
+    successors = []
+    left_m, left_c, boat = state
+    direction = -1 if boat == 1 else 1  # the boat carries people away from its bank
+    for m, c in boat_moves(capacity):
+        new_state = (left_m + direction * m, left_c + direction * c, 1 - boat)
+        if is_valid(new_state, missionaries, cannibals):
+            successors.append(new_state)
+    return successors
+
+
+class RiverCrossing:
+    """Breadth-first solver over a dense integer encoding of the states.
+
+    State (m, c, boat) has index (m * (cannibals + 1) + c) * 2 + boat, so the
+    visited set is a bytearray and the parent links an int array, both sized
+    by the number of possible states rather than by Python objects per state.
+    """
+
+    def __init__(self, missionaries=3, cannibals=3, capacity=2):
+        self.missionaries = missionaries
+        self.cannibals = cannibals
+        self.capacity = capacity
+        self.num_states = (missionaries + 1) * (cannibals + 1) * 2
+
+    def encode(self, state):
+        m, c, boat = state
+        return (m * (self.cannibals + 1) + c) * 2 + boat
+
+    def decode(self, index):
+        index, boat = divmod(index, 2)
+        m, c = divmod(index, self.cannibals + 1)
+        return (m, c, boat)
+
+    def successor_indices(self, index):
+        M, C = self.missionaries, self.cannibals
+        stride = 2 * (C + 1)  # index step for one missionary
+        left_m, left_c, boat = self.decode(index)
+        direction = -1 if boat == 1 else 1
+        successors = []
+        for dm, dc in boat_moves(self.capacity):
+            m = left_m + direction * dm
+            c = left_c + direction * dc
+            if m < 0 or c < 0 or m > M or c > C:
+                continue
+            if (0 < m < c) or (0 < M - m < C - c):
+                continue
+            successors.append(m * stride + c * 2 + (1 - boat))
+        return successors
+
+    def solve(self, start_state=None, goal_state=None, stats=None):
+        """Shortest list of states from start (everyone left) to goal (everyone right)."""
+        M, C = self.missionaries, self.cannibals
+        if start_state is None:
+            start_state = (M, C, 1)
+        if goal_state is None:
+            goal_state = (0, 0, 0)
+        if not is_valid(start_state, M, C):
+            return None
+        if stats is not None:
+            stats.start()
+        start = self.encode(start_state)
+        goal = self.encode(goal_state)
+        visited = bytearray(self.num_states)
+        parent = array('i', [-1]) * self.num_states
+        queue = array('i', [start])
+        visited[start] = 1
+        head = 0
+        path = None
+        while head < len(queue):
+            index = queue[head]
+            head += 1
+            if index == goal:
+                path = []
+                while index != -1:
+                    path.append(self.decode(index))
+                    index = parent[index]
+                path.reverse()
+                break
+            if stats is None:
+                successors = self.successor_indices(index)
+            else:
+                stats.expand(index, len(queue) - head + 1, len(queue))
+                successors = stats.successors(self.successor_indices, index)
+            for successor in successors:
+                if not visited[successor]:
+                    visited[successor] = 1
+                    parent[successor] = index
+                    queue.append(successor)
+        if stats is not None:
+            stats.stop()
+        return path
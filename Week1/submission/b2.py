@@ -1,8 +1,12 @@
-from collections import deque
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from common.search import dfs
 
 # Check if the current state is the goal state
 def is_goal(state):
-    return state == [1, 1, 1, 0, -1, -1, -1]
+    return state == (1, 1, 1, 0, -1, -1, -1)
 
 # Generate all possible successor states
 def get_successors(state):
@@ -13,41 +17,22 @@ def get_successors(state):
     for move in moves:
         new_index = empty_index + move
         if 0 <= new_index < len(state):  # Ensure new index is within bounds
-            new_state = state[:]
+            new_state = list(state)
             new_state[empty_index], new_state[new_index] = new_state[new_index], new_state[empty_index]
-            successors.append(new_state)
+            successors.append(tuple(new_state))
 
     return successors
 
-# Depth-first search to find the solution
-def dfs(start_state):
-    stack = [(start_state, [])]  # Stack for DFS
-    visited = set()
-
-    while stack:
-        current_state, path = stack.pop()
-        if tuple(current_state) in visited:
-            continue
-        visited.add(tuple(current_state))
-        path = path + [current_state]
-
-        if is_goal(current_state):
-            return path
-
-        for successor in get_successors(current_state):
-            stack.append((successor, path))
-
-    return None
-
-# Initialize the start state
-start_state = [-1, -1, -1, 0, 1, 1, 1]
+if __name__ == "__main__":
+    # Initialize the start state
+    start_state = (-1, -1, -1, 0, 1, 1, 1)
 
-# Run the DFS algorithm to find the solution
-solution = dfs(start_state)
+    # Run the DFS algorithm to find the solution
+    solution = dfs(start_state, get_successors, is_goal)
 
-if solution:
-    print("Solution found with", len(solution) - 1, "steps:")
-    for step in solution:
-        print(step)
-else:
-    print("No solution found.")
+    if solution:
+        print("Solution found with", len(solution) - 1, "steps:")
+        for step in solution:
+            print(step)
+    else:
+        print("No solution found.")
@@ -0,0 +1,140 @@
+import argparse
+import time
+from array import array
+from bisect import bisect_left
+
+# Rabbit leap with N rabbits on each side of a single empty stone.
+#
+# A row of 2N + 1 cells is packed into one int with 2 bits per cell
+# (0 = empty, 1 = a rabbit facing left (+1 in b1.py), 2 = a rabbit facing
+# right (-1 in b1.py)); the index of the empty cell is stored above the
+# cells so moves never have to search for it. Each BFS level is kept as a
+# sorted array of packed states instead of a queue of lists.
+
+EMPTY, LEFT, RIGHT = 0, 1, 2
+_CODES = {0: EMPTY, 1: LEFT, -1: RIGHT}
+_VALUES = {EMPTY: 0, LEFT: 1, RIGHT: -1}
+
+
+class RabbitLeap:
+    """Puzzle instance for n rabbits per side.
+
+    With forward_only=False a rabbit next to or one cell away from the empty
+    stone may move into it, as in b1.py/b2.py. With forward_only=True rabbits
+    only move in the direction they face, which is the classic puzzle.
+    """
+
+    def __init__(self, n, forward_only=False):
+        self.n = n
+        self.cells = 2 * n + 1
+        self.forward_only = forward_only
+        self.blank_shift = 2 * self.cells
+        self.start = self.encode([-1] * n + [0] + [1] * n)
+        self.goal = self.encode([1] * n + [0] + [-1] * n)
+        # moves[b]: (shift_t, shift_b, blank_delta, code) for each cell t that
+        # can move into an empty cell at b; `code` is the only rabbit allowed
+        # to make that move when forward_only (None means any rabbit)
+        self.moves = []
+        self.reverse_moves = []
+        for b in range(self.cells):
+            forward, backward = [], []
+            for t in (b - 2, b - 1, b + 1, b + 2):
+                if 0 <= t < self.cells:
+                    shifts = (2 * t, 2 * b, (b ^ t) << self.blank_shift)
+                    facing = RIGHT if t < b else LEFT
+                    if forward_only:
+                        forward.append(shifts + (facing,))
+                        backward.append(shifts + (LEFT if facing == RIGHT else RIGHT,))
+                    else:
+                        forward.append(shifts + (None,))
+                        backward.append(shifts + (None,))
+            self.moves.append(tuple(forward))
+            self.reverse_moves.append(tuple(backward))
+        state_bits = self.blank_shift + self.cells.bit_length()
+        self._typecode = 'Q' if state_bits <= 64 else None
+
+    def encode(self, row):
+        state = row.index(0) << self.blank_shift
+        for cell, value in enumerate(row):
+            state |= _CODES[value] << (2 * cell)
+        return state
+
+    def decode(self, state):
+        return [_VALUES[(state >> (2 * cell)) & 3] for cell in range(self.cells)]
+
+    def successors(self, state, reverse=False):
+        table = self.reverse_moves if reverse else self.moves
+        result = []
+        for shift_t, shift_b, blank_delta, code in table[state >> self.blank_shift]:
+            rabbit = (state >> shift_t) & 3
+            if code is not None and rabbit != code:
+                continue
+            result.append((state ^ (rabbit << shift_t) ^ blank_delta) | (rabbit << shift_b))
+        return result
+
+    def _level(self, states):
+        states = sorted(states)
+        return array(self._typecode, states) if self._typecode else states
+
+    @staticmethod
+    def _contains(level, state):
+        i = bisect_left(level, state)
+        return i < len(level) and level[i] == state
+
+    def solve(self):
+        """Breadth-first search; returns the list of rows or None.
+
+        Without forward_only every move can be undone, so a state's
+        neighbours lie in the previous, current or next level and only the
+        last two levels are needed to detect repeats. The classic rules are
+        one-way, so every level is checked there.
+        """
+        levels = [self._level([self.start])]
+        self.states_explored = 1
+        while not self._contains(levels[-1], self.goal):
+            lookback = levels if self.forward_only else levels[-2:]
+            frontier = set()
+            for state in levels[-1]:
+                for successor in self.successors(state):
+                    if not any(self._contains(level, successor) for level in lookback):
+                        frontier.add(successor)
+            if not frontier:
+                return None
+            levels.append(self._level(frontier))
+            self.states_explored += len(frontier)
+
+        # Walk back through the levels using predecessor moves
+        state = self.goal
+        path = [state]
+        for level in reversed(levels[:-1]):
+            for predecessor in self.successors(state, reverse=True):
+                if self._contains(level, predecessor):
+                    state = predecessor
+                    break
+            path.append(state)
+        return [self.decode(state) for state in reversed(path)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rabbit leap solver for N rabbits per side")
+    parser.add_argument('-n', type=int, default=3, help="rabbits on each side")
+    parser.add_argument('--forward-only', action='store_true', help="rabbits may only move forward")
+    args = parser.parse_args()
+
+    puzzle = RabbitLeap(args.n, args.forward_only)
+    began = time.perf_counter()
+    solution = puzzle.solve()
+    elapsed = time.perf_counter() - began
+
+    if solution:
+        print("Solution found with", len(solution) - 1, "steps:")
+        if args.n <= 5:
+            for step in solution:
+                print(step)
+    else:
+        print("No solution found.")
+    print(f"States explored: {puzzle.states_explored}, time: {elapsed:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
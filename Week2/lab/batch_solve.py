@@ -0,0 +1,160 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import signal
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import eight_bfs
+import eight_star
+import ida_star
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from common.stats import SearchStats
+
+# Solve many 8-puzzle instances in parallel.
+#
+# Input has one instance per line, either a JSON object
+#     {"id": "a", "start": [8, 6, 7, 2, 5, 4, 3, 0, 1], "goal": [1, 2, 3, 4, 5, 6, 7, 8, 0]}
+# or two boards written as digit strings:
+#     867254301 123456780
+# Results are written to stdout as JSON lines in the order they finish.
+
+DEFAULT_GOAL = [1, 2, 3, 4, 5, 6, 7, 8, 0]
+
+SOLVERS = {
+    'bfs': lambda start, goal, stats: eight_bfs.bfs(start, goal, stats),
+    'bidirectional': lambda start, goal, stats: eight_bfs.bidirectional_bfs(start, goal, stats),
+    'astar': lambda start, goal, stats: eight_star.search_agent(start, goal, 'manhattan', stats),
+    'ida': lambda start, goal, stats: ida_star.ida_star(start, goal, verbose=False, stats=stats),
+}
+
+
+def _check_board(board):
+    if sorted(board) != list(range(9)):
+        raise ValueError(f"{board} is not a permutation of 0..8")
+    return board
+
+
+def parse_instance(line, line_number):
+    line = line.strip()
+    if line.startswith('{'):
+        record = json.loads(line)
+        start = _check_board(list(record['start']))
+        return record.get('id', line_number), start, _check_board(list(record.get('goal', DEFAULT_GOAL)))
+    boards = line.split()
+    start = _check_board([int(c) for c in boards[0]])
+    goal = _check_board([int(c) for c in boards[1]]) if len(boards) > 1 else DEFAULT_GOAL
+    return line_number, start, goal
+
+
+def read_instances(source):
+    """(id, start, goal) per instance line; a line that cannot be parsed
+    yields its error record (a dict, as written by run_batch) instead."""
+    for line_number, line in enumerate(source, 1):
+        if line.strip() and not line.lstrip().startswith('#'):
+            try:
+                yield parse_instance(line, line_number)
+            except (ValueError, KeyError, TypeError) as e:
+                yield {'id': line_number, 'status': 'error', 'error': f"line {line_number}: {e!r}"}
+
+
+class _Timeout(Exception):
+    pass
+
+
+def _raise_timeout(signum, frame):
+    raise _Timeout()
+
+
+def solve_instance(instance_id, start, goal, solver, timeout):
+    """Run one solver in a worker process; never raises."""
+    result = {'id': instance_id, 'start': start, 'goal': goal, 'solver': solver}
+    stats = SearchStats(solver)
+    began = time.perf_counter()
+    try:
+        # The timer is disarmed in the inner finally, so an alarm that fires
+        # at any point up to the disarm is still caught as a timeout below
+        try:
+            if timeout:
+                signal.signal(signal.SIGALRM, _raise_timeout)
+                signal.setitimer(signal.ITIMER_REAL, timeout)
+            # eight_bfs prints its node count; keep stdout for the JSON lines
+            with contextlib.redirect_stdout(io.StringIO()):
+                path = SOLVERS[solver](start, goal, stats)
+            result['status'] = 'solved' if path else 'unsolvable'
+            result['path_length'] = len(path) - 1 if path else None
+        finally:
+            if timeout:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+    except _Timeout:
+        result['status'] = 'timeout'
+        result.pop('path_length', None)
+    except Exception as e:
+        result['status'] = 'error'
+        result['error'] = repr(e)
+    result['nodes_explored'] = stats.nodes_expanded
+    result['wall_time'] = time.perf_counter() - began
+    return result
+
+
+def run_batch(instances, solver='astar', workers=None, timeout=None, out=sys.stdout):
+    """Solve instances in a process pool and write each result as it completes.
+
+    At most a few tasks per worker are queued at a time, so arbitrarily long
+    inputs are streamed rather than read up front.
+    """
+    workers = workers or os.cpu_count()
+    max_pending = 4 * workers
+    counts = {}
+
+    def write(result):
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+        out.write(json.dumps(result) + '\n')
+        out.flush()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        instances = iter(instances)
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < max_pending:
+                try:
+                    instance = next(instances)
+                except StopIteration:
+                    exhausted = True
+                    break
+                if isinstance(instance, dict):  # error record of an unparsable line
+                    write(instance)
+                    continue
+                instance_id, start, goal = instance
+                pending.add(pool.submit(solve_instance, instance_id, start, goal, solver, timeout))
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                write(future.result())
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve 8-puzzle instances in parallel")
+    parser.add_argument('input', nargs='?', default='-', help="instance file, '-' for stdin")
+    parser.add_argument('--solver', choices=sorted(SOLVERS), default='astar')
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--timeout', type=float, default=None, help="seconds allowed per instance")
+    args = parser.parse_args()
+
+    if args.input == '-':
+        counts = run_batch(read_instances(sys.stdin), args.solver, args.workers, args.timeout)
+    else:
+        with open(args.input) as f:
+            counts = run_batch(read_instances(f), args.solver, args.workers, args.timeout)
+    print(' '.join(f"{status}={n}" for status, n in sorted(counts.items())), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,14 @@
+import argparse
 from collections import deque
 import numpy as np
+import os
 import random
+import sys
+
+import puzzle_state
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from common.stats import SearchStats
 
 # Author : Pratik Shah
 # Date : August 20, 2024
@@ -16,77 +24,151 @@ class Node:
         self.parent = parent
 
 def get_successors(node):
-    successors = []
-    value = 0
-    index = node.state.index(0)
-    quotient = index//3
-    remainder = index%3
-    # Row constrained moves
-    if quotient == 0:
-        moves = [3]
-    if quotient == 1:
-        moves = [-3, 3]
-    if quotient == 2:
-        moves = [-3]
-    # Column constrained moves
-    if remainder == 0:
-        moves += [1]
-    if remainder == 1:
-        moves += [-1, 1]
-    if remainder == 2:
-        moves += [-1]
-
-    # moves = [-1, 1, 3, -3]
-    for move in moves:
-        im = index+move
-        if im >= 0 and im < 9:
-            new_state = list(node.state)
-            temp = new_state[im]
-            new_state[im] = new_state[index]
-            new_state[index] = temp
-            successor = Node(new_state, node)
-            successors.append(successor)            
-    return successors
+    # node.state is a packed board, see puzzle_state
+    return [Node(state, node) for state in puzzle_state.successors(node.state)]
 
-def bfs(start_state, goal_state):
-    start_node = Node(start_state)
-    goal_node = Node(goal_state)
+def bfs(start_state, goal_state, stats=None):
+    # stats: optional common.stats.SearchStats
+    if stats is not None:
+        stats.start()
+    start_node = Node(puzzle_state.encode(start_state))
+    goal = puzzle_state.encode(goal_state)
     queue = deque([start_node])
     visited = set()
     nodes_explored = 0
     while queue:
         node = queue.popleft()
-        if tuple(node.state) in visited:
+        if node.state in visited:
             continue
-        visited.add(tuple(node.state))
+        visited.add(node.state)
         # print(node.state)
         nodes_explored = nodes_explored + 1
-        if node.state == list(goal_node.state):
+        if stats is not None:
+            stats.expand(node.state, len(queue) + 1, len(visited))
+        if node.state == goal:
             path = []
             while node:
-                path.append(node.state)
+                path.append(puzzle_state.decode(node.state))
                 node = node.parent
             print('Total nodes explored', nodes_explored)
+            if stats is not None:
+                stats.stop()
             return path[::-1]
-        for successor in get_successors(node):
+        if stats is None:
+            successors = get_successors(node)
+        else:
+            successors = stats.successors(get_successors, node)
+        for successor in successors:
             queue.append(successor)
     # print('Total nodes explored', nodes_explored)
+    if stats is not None:
+        stats.stop()
     return None
 
-start_state = [1, 2, 3, 4, 5, 6, 7, 8, 0]
-s_node = Node(start_state)
-D = 20
-d = 0
-while d <= D:
-    goal_state = random.choice(list(get_successors(s_node))).state
-    s_node = Node(goal_state)
-    d = d+1
-    # print(goal_state)
+def bidirectional_bfs(start_state, goal_state, stats=None):
+    # Grow one BFS tree from the start and one from the goal, always expanding
+    # a whole level of the smaller frontier, until the two trees touch. Moves
+    # are reversible, so get_successors also gives predecessors for the
+    # backward tree.
+    if stats is not None:
+        stats.start()
+    start_key = puzzle_state.encode(start_state)
+    goal_key = puzzle_state.encode(goal_state)
+    forward = {start_key: None}  # state -> parent on the way back to start
+    backward = {goal_key: None}  # state -> next state on the way to goal
+    forward_frontier = [Node(start_key)]
+    backward_frontier = [Node(goal_key)]
+    nodes_explored = 0
+    meeting = start_key if start_key == goal_key else None
+    while meeting is None and forward_frontier and backward_frontier:
+        if len(forward_frontier) <= len(backward_frontier):
+            frontier, parents, other = forward_frontier, forward, backward
+        else:
+            frontier, parents, other = backward_frontier, backward, forward
+        next_frontier = []
+        best_length = None
+        for node in frontier:
+            nodes_explored = nodes_explored + 1
+            key = node.state
+            if stats is None:
+                successors = get_successors(node)
+            else:
+                stats.expand(key, len(frontier), len(forward) + len(backward))
+                successors = stats.successors(get_successors, node)
+            for successor in successors:
+                successor_key = successor.state
+                if successor_key in parents:
+                    continue
+                parents[successor_key] = key
+                next_frontier.append(successor)
+                if successor_key in other:
+                    # Finish the level so the shortest meeting point wins
+                    length = _chain_length(forward, successor_key) + _chain_length(backward, successor_key)
+                    if best_length is None or length < best_length:
+                        best_length = length
+                        meeting = successor_key
+        if frontier is forward_frontier:
+            forward_frontier = next_frontier
+        else:
+            backward_frontier = next_frontier
+    print('Total nodes explored', nodes_explored)
+    if stats is not None:
+        stats.stop()
+    if meeting is None:
+        return None
+    path = []
+    key = meeting
+    while key is not None:
+        path.append(puzzle_state.decode(key))
+        key = forward[key]
+    path.reverse()
+    key = backward[meeting]
+    while key is not None:
+        path.append(puzzle_state.decode(key))
+        key = backward[key]
+    return path
+
+def _chain_length(parents, key):
+    length = 0
+    while parents[key] is not None:
+        key = parents[key]
+        length = length + 1
+    return length
+
+def random_goal(start_state, D=20):
+    s_node = Node(puzzle_state.encode(start_state))
+    d = 0
+    while d <= D:
+        goal_state = random.choice(list(get_successors(s_node))).state
+        s_node = Node(goal_state)
+        d = d+1
+        # print(goal_state)
+    return puzzle_state.decode(goal_state)
+
+def main():
+    parser = argparse.ArgumentParser(description="Eight puzzle solver")
+    parser.add_argument('--mode', choices=['bfs', 'bidirectional'], default='bfs',
+                        help="search from the start only, or from both ends")
+    parser.add_argument('--depth', type=int, default=20, help="length of the random walk used to build the goal")
+    parser.add_argument('--stats', choices=['text', 'json'], default=None, help="print search statistics")
+    args = parser.parse_args()
+
+    start_state = [1, 2, 3, 4, 5, 6, 7, 8, 0]
+    goal_state = random_goal(start_state, args.depth)
+
+    stats = SearchStats(args.mode) if args.stats else None
+    if args.mode == 'bidirectional':
+        solution = bidirectional_bfs(start_state, goal_state, stats)
+    else:
+        solution = bfs(start_state, goal_state, stats)
+    if solution:
+        print("Solution found:")
+        for step in solution:
+            print(step)
+    else:
+        print("No solution found.")
+    if stats is not None:
+        print(stats.report(args.stats))
 
-solution = bfs(start_state, goal_state)
-if solution:
-    print("Solution found:")
-    for step in solution:
-        print(step)
-else:
-    print("No solution found.")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import argparse
+import mmap
+from collections import deque
+from math import factorial
+
+import puzzle_state
+
+# Exact distance-to-goal table for the 8-puzzle.
+#
+# Every board is a permutation of 0..8 and is indexed by its Lehmer rank
+# (0 .. 9! - 1). The file holds a short header with the goal board followed by
+# one byte per rank: the number of moves to the goal, or UNREACHABLE for the
+# half of the permutations with the wrong parity. Solving a board is then a
+# greedy walk to any neighbour whose distance is one smaller.
+
+MAGIC = b'8PDB'
+HEADER_SIZE = len(MAGIC) + 9
+TABLE_SIZE = factorial(9)
+UNREACHABLE = 255
+DEFAULT_GOAL = [1, 2, 3, 4, 5, 6, 7, 8, 0]
+
+_FACTORIALS = [factorial(8 - i) for i in range(9)]
+
+
+def check_tiles(tiles):
+    """Raise ValueError unless `tiles` is a permutation of 0..8."""
+    if sorted(tiles) != list(range(9)):
+        raise ValueError(f"{list(tiles)} is not a permutation of 0..8")
+
+
+def rank(tiles):
+    """Lehmer rank of a permutation of 0..8."""
+    r = 0
+    for i in range(8):
+        tile = tiles[i]
+        smaller = 0
+        for j in range(i + 1, 9):
+            if tiles[j] < tile:
+                smaller += 1
+        r += smaller * _FACTORIALS[i]
+    return r
+
+
+def unrank(r):
+    remaining = list(range(9))
+    tiles = []
+    for i in range(9):
+        index, r = divmod(r, _FACTORIALS[i])
+        tiles.append(remaining.pop(index))
+    return tiles
+
+
+def build(path, goal_state=DEFAULT_GOAL):
+    """Breadth-first search from the goal over all reachable boards."""
+    check_tiles(goal_state)
+    table = bytearray([UNREACHABLE]) * TABLE_SIZE
+    goal = puzzle_state.encode(goal_state)
+    table[rank(goal_state)] = 0
+    frontier = deque([goal])
+    while frontier:
+        state = frontier.popleft()
+        distance = table[rank(puzzle_state.decode(state))] + 1
+        for successor in puzzle_state.successors(state):
+            r = rank(puzzle_state.decode(successor))
+            if table[r] == UNREACHABLE:
+                table[r] = distance
+                frontier.append(successor)
+    with open(path, 'wb') as f:
+        f.write(MAGIC + bytes(goal_state))
+        f.write(table)
+    return table
+
+
+class DistanceDatabase:
+    """Read-only view of a table written by build(), memory-mapped."""
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC or len(self._map) != HEADER_SIZE + TABLE_SIZE:
+            self.close()
+            raise ValueError(f"{path} is not an 8-puzzle distance table")
+        self.goal_state = list(self._map[len(MAGIC):HEADER_SIZE])
+
+    def distance(self, tiles):
+        """Moves from `tiles` to the goal, or None if the goal is unreachable."""
+        check_tiles(tiles)
+        d = self._map[HEADER_SIZE + rank(tiles)]
+        return None if d == UNREACHABLE else d
+
+    def solve(self, start_state):
+        """Optimal path from start_state to the goal as a list of boards."""
+        d = self.distance(start_state)
+        if d is None:
+            return None
+        state = puzzle_state.encode(start_state)
+        path = [list(start_state)]
+        while d > 0:
+            for successor in puzzle_state.successors(state):
+                tiles = puzzle_state.decode(successor)
+                if self._map[HEADER_SIZE + rank(tiles)] == d - 1:
+                    state = successor
+                    path.append(tiles)
+                    d -= 1
+                    break
+            else:
+                raise ValueError(f"distance table is inconsistent: no neighbour of {path[-1]} is {d - 1} moves away")
+        return path
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="8-puzzle distance database")
+    parser.add_argument('--db', default='eight_puzzle.db', help="table file")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build_parser = commands.add_parser('build', help="compute and write the table")
+    build_parser.add_argument('--goal', type=int, nargs=9, default=DEFAULT_GOAL)
+    solve_parser = commands.add_parser('solve', help="print an optimal solution")
+    solve_parser.add_argument('tiles', type=int, nargs=9)
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        table = build(args.db, args.goal)
+        reachable = sum(1 for d in table if d != UNREACHABLE)
+        print(f"Wrote {args.db}: {reachable} reachable states, max distance {max(d for d in table if d != UNREACHABLE)}")
+        return
+
+    try:
+        check_tiles(args.tiles)
+    except ValueError as e:
+        parser.error(str(e))
+    with DistanceDatabase(args.db) as db:
+        solution = db.solve(args.tiles)
+    if solution:
+        print("Solution found with", len(solution) - 1, "moves:")
+        for step in solution:
+            print(step)
+    else:
+        print("No solution found.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,16 @@
+import argparse
 import heapq
 import random
 
+import os
+import sys
+
+import puzzle_state
+from heuristics import HEURISTICS
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from common.stats import SearchStats
+
 # Author : Pratik Shah
 # Date : Sept 4, 2024
 # Place : IIIT Vadodara
@@ -20,69 +30,75 @@ class Node:
     def __lt__(self, other):
         return self.f < other.f  # Use f for comparison
 
-def heuristic(state, goal_state):
-    # Heuristic: Count the number of misplaced tiles
-    h = sum(1 for i in range(len(state)) if state[i] != goal_state[i] and state[i] != 0)
-    return h
-
-def get_successors(node):
+def get_successors(node, heuristic):
+    # The heuristic is updated from the parent's h for the one tile that moved
     successors = []
-    index = node.state.index(0)  # Find the index of the empty space (0)
-    moves = []
-    # Determine possible moves based on current index
-    if index // 3 > 0:  # Can move up
-        moves.append(-3)
-    if index // 3 < 2:  # Can move down
-        moves.append(3)
-    if index % 3 > 0:  # Can move left
-        moves.append(-1)
-    if index % 3 < 2:  # Can move right
-        moves.append(1)
-
-    for move in moves:
-        new_index = index + move
-        new_state = list(node.state)
-        # Swap the empty space with the adjacent tile
-        new_state[index], new_state[new_index] = new_state[new_index], new_state[index]
-        h = heuristic(new_state, [1, 2, 3, 4, 5, 6, 7, 8, 0])  # Calculate the heuristic for the new state
+    blank = puzzle_state.blank_index(node.state)
+    for new_state, target in puzzle_state.moves(node.state):
+        h = heuristic.update(node.h, node.state, blank, target)
         successor = Node(new_state, node, node.g + 1, h)
-        successors.append(successor)            
+        successors.append(successor)
 
     return successors
 
-def search_agent(start_state, goal_state):
-    start_node = Node(start_state, None, 0, heuristic(start_state, goal_state))
+def search_agent(start_state, goal_state, heuristic='manhattan', stats=None):
+    # heuristic: 'misplaced', 'manhattan' or 'linear_conflict'
+    # stats: optional common.stats.SearchStats
+    heuristic = HEURISTICS[heuristic](goal_state, tile_at=puzzle_state.tile_at)
+    start_state = puzzle_state.encode(start_state)
+    goal_state = puzzle_state.encode(goal_state)
+    start_node = Node(start_state, None, 0, heuristic.evaluate(start_state))
     frontier = []
     heapq.heappush(frontier, start_node)
     visited = set()
+    if stats is not None:
+        stats.start()
     
     while frontier:
         node = heapq.heappop(frontier)
-        if tuple(node.state) in visited:
+        if node.state in visited:
             continue
-        visited.add(tuple(node.state))
+        visited.add(node.state)
+        if stats is not None:
+            stats.expand(node.state, len(frontier) + 1, len(visited))
         
         if node.state == goal_state:
             path = []
             while node:
-                path.append(node.state)
+                path.append(puzzle_state.decode(node.state))
                 node = node.parent
+            if stats is not None:
+                stats.stop()
             return path[::-1]  # Return the path in the correct order
         
-        for successor in get_successors(node):
+        if stats is None:
+            successors = get_successors(node, heuristic)
+        else:
+            successors = stats.successors(get_successors, node, heuristic)
+        for successor in successors:
             heapq.heappush(frontier, successor)
 
+    if stats is not None:
+        stats.stop()
     return None
 
-# Initialize the start state and generate a random goal state
-start_state = [1, 2, 3, 4, 5, 6, 7, 8, 0]
-goal_state = [1, 2, 3, 4, 5, 6, 7, 8, 0]  # Set a valid goal state for testing
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="8-puzzle A* search")
+    parser.add_argument('--stats', choices=['text', 'json'], default=None, help="print search statistics")
+    args = parser.parse_args()
+
+    # Initialize the start state and generate a random goal state
+    start_state = [1, 2, 3, 4, 5, 6, 7, 8, 0]
+    goal_state = [1, 2, 3, 4, 5, 6, 7, 8, 0]  # Set a valid goal state for testing
 
-# Run the search algorithm
-solution = search_agent(start_state, goal_state)
-if solution:
-    print("Solution found:")
-    for step in solution:
-        print(step)
-else:
-    print("No solution found.")
+    # Run the search algorithm
+    stats = SearchStats('a*') if args.stats else None
+    solution = search_agent(start_state, goal_state, stats=stats)
+    if solution:
+        print("Solution found:")
+        for step in solution:
+            print(step)
+    else:
+        print("No solution found.")
+    if stats is not None:
+        print(stats.report(args.stats))
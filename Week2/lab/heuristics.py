@@ -0,0 +1,128 @@
+import operator
+
+# Admissible heuristics for sliding puzzles of any width and any goal.
+#
+# Each heuristic is built once per goal and then answers two questions:
+#   evaluate(board)                  -> value computed from scratch
+#   update(h, board, blank, target)  -> value after the tile at `target`
+#                                       slides into the `blank` position,
+#                                       given the parent's value h
+# `board` is the parent board; tiles are read through `tile_at(board, pos)`,
+# so the same object works on lists/bytearrays (the default) and on packed
+# ints (pass puzzle_state.tile_at).
+
+
+class MisplacedTiles:
+    name = 'misplaced'
+
+    def __init__(self, goal, width=3, tile_at=operator.getitem):
+        self.width = width
+        self.size = width * width
+        self.tile_at = tile_at
+        self.goal_pos = [0] * self.size
+        for position, tile in enumerate(goal):
+            self.goal_pos[tile] = position
+
+    def evaluate(self, board):
+        goal_pos = self.goal_pos
+        tile_at = self.tile_at
+        h = 0
+        for position in range(self.size):
+            tile = tile_at(board, position)
+            if tile != 0 and goal_pos[tile] != position:
+                h += 1
+        return h
+
+    def update(self, h, board, blank, target):
+        goal = self.goal_pos[self.tile_at(board, target)]
+        return h + (goal != blank) - (goal != target)
+
+
+class Manhattan(MisplacedTiles):
+    name = 'manhattan'
+
+    def __init__(self, goal, width=3, tile_at=operator.getitem):
+        super().__init__(goal, width, tile_at)
+        # distance[tile][position]: moves needed to bring tile home from position
+        self.distance = []
+        for tile in range(self.size):
+            goal_row, goal_col = divmod(self.goal_pos[tile], width)
+            row_distances = []
+            for position in range(self.size):
+                row, col = divmod(position, width)
+                row_distances.append(0 if tile == 0 else abs(row - goal_row) + abs(col - goal_col))
+            self.distance.append(row_distances)
+
+    def evaluate(self, board):
+        distance = self.distance
+        tile_at = self.tile_at
+        return sum(distance[tile_at(board, position)][position] for position in range(self.size))
+
+    def update(self, h, board, blank, target):
+        distance = self.distance[self.tile_at(board, target)]
+        return h + distance[blank] - distance[target]
+
+
+class LinearConflict(Manhattan):
+    """Manhattan distance plus 2 for every tile that must leave its goal line.
+
+    Within one row (or column), the tiles that belong to that line but sit in
+    the wrong relative order force extra moves: at least
+    2 * (tiles in line - longest correctly ordered subsequence).
+    """
+    name = 'linear_conflict'
+
+    def __init__(self, goal, width=3, tile_at=operator.getitem):
+        super().__init__(goal, width, tile_at)
+        self.rows = [tuple(range(r * width, (r + 1) * width)) for r in range(width)]
+        self.cols = [tuple(range(c, self.size, width)) for c in range(width)]
+        # For rows, a tile's key is its goal column if its goal is in that row
+        self.row_key = [[None] * self.size for _ in range(width)]
+        self.col_key = [[None] * self.size for _ in range(width)]
+        for tile in range(1, self.size):
+            goal_row, goal_col = divmod(self.goal_pos[tile], width)
+            self.row_key[goal_row][tile] = goal_col
+            self.col_key[goal_col][tile] = goal_row
+
+    @staticmethod
+    def _conflict(tiles, keys):
+        order = [keys[tile] for tile in tiles if keys[tile] is not None]
+        if len(order) < 2:
+            return 0
+        # Longest increasing subsequence; lines have at most `width` tiles
+        longest = [1] * len(order)
+        for i in range(1, len(order)):
+            for j in range(i):
+                if order[j] < order[i] and longest[j] + 1 > longest[i]:
+                    longest[i] = longest[j] + 1
+        return 2 * (len(order) - max(longest))
+
+    def evaluate(self, board):
+        tile_at = self.tile_at
+        h = super().evaluate(board)
+        for r, positions in enumerate(self.rows):
+            h += self._conflict([tile_at(board, p) for p in positions], self.row_key[r])
+        for c, positions in enumerate(self.cols):
+            h += self._conflict([tile_at(board, p) for p in positions], self.col_key[c])
+        return h
+
+    def update(self, h, board, blank, target):
+        tile_at = self.tile_at
+        tile = tile_at(board, target)
+        h = super().update(h, board, blank, target)
+        # A horizontal slide keeps the order within the row and changes two
+        # columns; a vertical slide changes two rows.
+        if blank // self.width == target // self.width:
+            lines = (self.cols[blank % self.width], self.cols[target % self.width])
+            keys = (self.col_key[blank % self.width], self.col_key[target % self.width])
+        else:
+            lines = (self.rows[blank // self.width], self.rows[target // self.width])
+            keys = (self.row_key[blank // self.width], self.row_key[target // self.width])
+        for positions, line_keys in zip(lines, keys):
+            before = [tile_at(board, p) for p in positions]
+            after = [tile if p == blank else 0 if p == target else t for p, t in zip(positions, before)]
+            h += self._conflict(after, line_keys) - self._conflict(before, line_keys)
+        return h
+
+
+HEURISTICS = {cls.name: cls for cls in (MisplacedTiles, Manhattan, LinearConflict)}
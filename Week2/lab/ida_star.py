@@ -0,0 +1,164 @@
+import argparse
+import os
+import random
+import sys
+
+from heuristics import HEURISTICS
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from common.stats import SearchStats
+
+# Iterative-deepening A* for width x width sliding puzzles (8-puzzle, 15-puzzle).
+#
+# Only one board exists during the search: each move is applied in place on a
+# bytearray and undone on the way back, and the heuristic is updated
+# incrementally, so memory stays proportional to the solution depth.
+
+
+def neighbour_table(width):
+    """neighbours[p] lists the positions the blank at p can swap with."""
+    table = []
+    for position in range(width * width):
+        row, col = divmod(position, width)
+        targets = []
+        if row > 0:
+            targets.append(position - width)
+        if row < width - 1:
+            targets.append(position + width)
+        if col > 0:
+            targets.append(position - 1)
+        if col < width - 1:
+            targets.append(position + 1)
+        table.append(tuple(targets))
+    return table
+
+
+def _parity(tiles, width):
+    tiles_only = [tile for tile in tiles if tile != 0]
+    inversions = sum(1 for i in range(len(tiles_only)) for j in range(i + 1, len(tiles_only))
+                     if tiles_only[i] > tiles_only[j])
+    if width % 2 == 0:
+        inversions += tiles.index(0) // width
+    return inversions % 2
+
+
+def is_solvable(start_state, goal_state, width=3):
+    """Two boards are connected iff their permutation parities agree."""
+    return _parity(start_state, width) == _parity(goal_state, width)
+
+
+def ida_star(start_state, goal_state, width=3, heuristic='manhattan', verbose=True, stats=None):
+    # stats: optional common.stats.SearchStats; the frontier size reported is
+    # the current depth, and stats.extra['iterations'] lists every threshold
+    if not is_solvable(start_state, goal_state, width):
+        return None
+    board = bytearray(start_state)
+    goal = bytes(goal_state)
+    neighbours = neighbour_table(width)
+    estimate = HEURISTICS[heuristic](goal_state, width)
+    moves = []  # positions the blank moved to, in order
+    nodes = 0
+
+    def search(blank, previous, g, h, threshold):
+        # Returns -1 when solved, else the smallest f that exceeded threshold
+        nonlocal nodes
+        nodes += 1
+        if stats is not None:
+            stats.expand(blank, g, 0)
+        f = g + h
+        if f > threshold:
+            return f
+        if board == goal:
+            return -1
+        minimum = None
+        for target in neighbours[blank]:
+            if target == previous:
+                continue
+            child_h = estimate.update(h, board, blank, target)
+            board[blank] = board[target]
+            board[target] = 0
+            moves.append(target)
+            result = search(target, blank, g + 1, child_h, threshold)
+            if result == -1:
+                return -1
+            moves.pop()
+            board[target] = board[blank]
+            board[blank] = 0
+            if minimum is None or result < minimum:
+                minimum = result
+        return minimum
+
+    threshold = estimate.evaluate(board)
+    iteration = 0
+    if stats is not None:
+        stats.start()
+        stats.extra['iterations'] = []
+    while True:
+        nodes = 0
+        result = search(board.index(0), -1, 0, estimate.evaluate(board), threshold)
+        iteration += 1
+        if stats is not None:
+            stats.extra['iterations'].append({'threshold': threshold, 'nodes': nodes})
+        if verbose:
+            print(f"Iteration {iteration}: threshold {threshold}, nodes explored {nodes}")
+        if result == -1:
+            break
+        if result is None:
+            moves = None
+            break
+        threshold = result
+    if stats is not None:
+        stats.stop()
+    if moves is None:
+        return None
+
+    # Replay the blank moves to turn them into a list of boards
+    board = list(start_state)
+    blank = board.index(0)
+    path = [list(board)]
+    for target in moves:
+        board[blank], board[target] = board[target], 0
+        blank = target
+        path.append(list(board))
+    return path
+
+
+def scramble(goal_state, width, depth):
+    board = list(goal_state)
+    neighbours = neighbour_table(width)
+    blank = board.index(0)
+    previous = -1
+    for _ in range(depth):
+        target = random.choice([t for t in neighbours[blank] if t != previous])
+        board[blank], board[target] = board[target], 0
+        previous, blank = blank, target
+    return board
+
+
+def main():
+    parser = argparse.ArgumentParser(description="IDA* sliding puzzle solver")
+    parser.add_argument('--width', type=int, default=3, help="3 for the 8-puzzle, 4 for the 15-puzzle")
+    parser.add_argument('--heuristic', choices=sorted(HEURISTICS), default='linear_conflict')
+    parser.add_argument('--depth', type=int, default=30, help="length of the random scramble")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--stats', choices=['text', 'json'], default=None, help="print search statistics")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    goal_state = list(range(1, args.width * args.width)) + [0]
+    start_state = scramble(goal_state, args.width, args.depth)
+
+    stats = SearchStats('ida*') if args.stats else None
+    solution = ida_star(start_state, goal_state, args.width, args.heuristic, stats=stats)
+    if solution:
+        print("Solution found with", len(solution) - 1, "moves:")
+        for step in solution:
+            print(step)
+    else:
+        print("No solution found.")
+    if stats is not None:
+        print(stats.report(args.stats))
+
+
+if __name__ == "__main__":
+    main()
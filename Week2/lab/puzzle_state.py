@@ -0,0 +1,81 @@
+# Packed sliding-puzzle states.
+#
+# A board of width w is stored in a single int: the tile at position p lives
+# in bits 4p..4p+3 and the index of the blank is kept in the nibble just
+# above the board, so successors never have to search for the 0 tile. The
+# int is hashed directly by the visited sets; convert back to a list with
+# decode() only when a board has to be shown.
+
+_TABLES = {}
+
+
+def _tables(width):
+    """Return (size, blank_shift, moves) for a board of the given width.
+
+    moves[b] lists (shift_t, shift_b, blank_delta) for every position t the
+    blank at b can swap with: the tile nibble is read at shift_t, written at
+    shift_b, and blank_delta is XORed into the blank-index nibble.
+    """
+    tables = _TABLES.get(width)
+    if tables is None:
+        size = width * width
+        blank_shift = 4 * size
+        moves = []
+        for b in range(size):
+            row, col = divmod(b, width)
+            targets = []
+            if row > 0:
+                targets.append(b - width)
+            if row < width - 1:
+                targets.append(b + width)
+            if col > 0:
+                targets.append(b - 1)
+            if col < width - 1:
+                targets.append(b + 1)
+            moves.append(tuple((4 * t, 4 * b, (b ^ t) << blank_shift) for t in targets))
+        tables = _TABLES[width] = (size, blank_shift, tuple(moves))
+    return tables
+
+
+def encode(tiles, width=3):
+    """Pack a list of tiles (0 is the blank) into an int."""
+    _, blank_shift, _ = _tables(width)
+    state = tiles.index(0) << blank_shift
+    for position, tile in enumerate(tiles):
+        state |= tile << (4 * position)
+    return state
+
+
+def decode(state, width=3):
+    """Unpack an int produced by encode() back into a list of tiles."""
+    size = width * width
+    return [(state >> (4 * position)) & 15 for position in range(size)]
+
+
+def tile_at(state, position):
+    return (state >> (4 * position)) & 15
+
+
+def blank_index(state, width=3):
+    return state >> (4 * width * width)
+
+
+def successors(state, width=3):
+    """Return the packed boards reachable by sliding one tile into the blank."""
+    _, blank_shift, moves = _tables(width)
+    result = []
+    for shift_t, shift_b, blank_delta in moves[state >> blank_shift]:
+        tile = (state >> shift_t) & 15
+        result.append((state ^ (tile << shift_t) ^ blank_delta) | (tile << shift_b))
+    return result
+
+
+def moves(state, width=3):
+    """Like successors(), but pair each board with the position the moved
+    tile came from (the blank's old position is blank_index(state))."""
+    _, blank_shift, table = _tables(width)
+    result = []
+    for shift_t, shift_b, blank_delta in table[state >> blank_shift]:
+        tile = (state >> shift_t) & 15
+        result.append(((state ^ (tile << shift_t) ^ blank_delta) | (tile << shift_b), shift_t >> 2))
+    return result
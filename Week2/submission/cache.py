@@ -0,0 +1,220 @@
+import hashlib
+import json
+import sqlite3
+import time
+
+import numpy as np
+
+from ingest import split_sentences
+
+# On-disk cache for plag.py and scan_corpus.py, kept in a single SQLite file.
+#
+#   documents - normalised sentence list of a text, keyed by its content hash
+#   distances - edit distance of a sentence pair, keyed by the two sentence
+#               hashes in sorted order (the distance is symmetric)
+#   results   - plagiarism cases of a document pair for a method/threshold
+#
+# Every row carries a last_used stamp and an approximate size in bytes. When
+# the total grows past max_bytes the least recently used rows, from any
+# table, are deleted until it is back under 90% of the bound.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    hash BLOB PRIMARY KEY,
+    sentences TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_used INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS distances (
+    hash1 BLOB NOT NULL,
+    hash2 BLOB NOT NULL,
+    distance INTEGER NOT NULL,
+    last_used INTEGER NOT NULL,
+    PRIMARY KEY (hash1, hash2)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS results (
+    hash1 BLOB NOT NULL,
+    hash2 BLOB NOT NULL,
+    method TEXT NOT NULL,
+    threshold INTEGER NOT NULL,
+    cases TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_used INTEGER NOT NULL,
+    PRIMARY KEY (hash1, hash2, method, threshold)
+);
+CREATE INDEX IF NOT EXISTS documents_last_used ON documents (last_used);
+CREATE INDEX IF NOT EXISTS distances_last_used ON distances (last_used);
+CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used);
+"""
+
+DISTANCE_ROW_SIZE = 48  # two 16-byte hashes plus the integers
+ROW_OVERHEAD = 40       # keys and integers of a documents/results row
+
+
+def text_key(text):
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+
+def file_key(path, chunk_size=1 << 20):
+    """Content hash of a file, read in chunks."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.digest()
+
+
+class PlagiarismCache:
+    def __init__(self, path, max_bytes=256 << 20):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+        self.connection.executescript("""
+            CREATE TEMP TABLE left_sentences (position INTEGER, hash BLOB);
+            CREATE TEMP TABLE right_sentences (position INTEGER, hash BLOB);
+        """)
+        self.hits = 0
+        self.misses = 0
+        self.size = self._total_size()
+
+    def _total_size(self):
+        (documents,), = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM documents")
+        (distances,), = self.connection.execute("SELECT COUNT(*) FROM distances")
+        (results,), = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM results")
+        return documents + distances * DISTANCE_ROW_SIZE + results
+
+    # Documents
+
+    def get_document(self, key):
+        row = self.connection.execute("SELECT sentences FROM documents WHERE hash = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        with self.connection:
+            self.connection.execute("UPDATE documents SET last_used = ? WHERE hash = ?", (time.time_ns(), key))
+        return json.loads(row[0])
+
+    def put_document(self, key, sentences):
+        data = json.dumps(sentences)
+        self._replace("documents", "hash = ?", (key,),
+                      "INSERT INTO documents VALUES (?, ?, ?, ?)",
+                      (key, data, len(data) + ROW_OVERHEAD, time.time_ns()))
+
+    def sentences(self, text):
+        """preprocess_input(text), from the cache when the text was seen before."""
+        key = text_key(text)
+        sentences = self.get_document(key)
+        if sentences is None:
+            sentences = split_sentences(text)
+            self.put_document(key, sentences)
+        return sentences
+
+    # Sentence-pair distances
+
+    def distances(self, sentences1, sentences2):
+        """Cached edit distances as an n1 x n2 int array, -1 where unknown."""
+        matrix = np.full((len(sentences1), len(sentences2)), -1, dtype=int)
+        if not sentences1 or not sentences2:
+            return matrix
+        with self.connection:
+            self.connection.execute("DELETE FROM left_sentences")
+            self.connection.execute("DELETE FROM right_sentences")
+            self.connection.executemany("INSERT INTO left_sentences VALUES (?, ?)",
+                                        ((i, text_key(s)) for i, s in enumerate(sentences1)))
+            self.connection.executemany("INSERT INTO right_sentences VALUES (?, ?)",
+                                        ((j, text_key(s)) for j, s in enumerate(sentences2)))
+            pairs = """
+                FROM left_sentences l, right_sentences r
+                JOIN distances d ON d.hash1 = min(l.hash, r.hash) AND d.hash2 = max(l.hash, r.hash)
+            """
+            found = self.connection.execute("SELECT l.position, r.position, d.distance " + pairs).fetchall()
+            if found:
+                self.connection.execute(
+                    "UPDATE distances SET last_used = ? WHERE (hash1, hash2) IN (SELECT d.hash1, d.hash2 " + pairs + ")",
+                    (time.time_ns(),))
+        for i, j, distance in found:
+            matrix[i, j] = distance
+        self.hits += len(found)
+        self.misses += matrix.size - len(found)
+        return matrix
+
+    def put_distances(self, triples):
+        """Store (sentence1, sentence2, distance) triples."""
+        now = time.time_ns()
+        rows = []
+        for sentence1, sentence2, distance in triples:
+            key1, key2 = sorted((text_key(sentence1), text_key(sentence2)))
+            rows.append((key1, key2, int(distance), now))
+        with self.connection:
+            cursor = self.connection.executemany("INSERT OR IGNORE INTO distances VALUES (?, ?, ?, ?)", rows)
+        self.size += cursor.rowcount * DISTANCE_ROW_SIZE
+        self._evict()
+
+    # Document-pair results
+
+    def get_result(self, key1, key2, method, threshold):
+        where = (key1, key2, method, threshold)
+        row = self.connection.execute(
+            "SELECT cases FROM results WHERE hash1 = ? AND hash2 = ? AND method = ? AND threshold = ?",
+            where).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        with self.connection:
+            self.connection.execute(
+                "UPDATE results SET last_used = ? WHERE hash1 = ? AND hash2 = ? AND method = ? AND threshold = ?",
+                (time.time_ns(),) + where)
+        return [tuple(case) for case in json.loads(row[0])]
+
+    def put_result(self, key1, key2, method, threshold, cases):
+        data = json.dumps(cases)
+        self._replace("results", "hash1 = ? AND hash2 = ? AND method = ? AND threshold = ?",
+                      (key1, key2, method, threshold),
+                      "INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                      (key1, key2, method, threshold, data, len(data) + ROW_OVERHEAD, time.time_ns()))
+
+    # Bookkeeping
+
+    def _replace(self, table, where, key, insert, row):
+        with self.connection:
+            old = self.connection.execute(f"SELECT size FROM {table} WHERE {where}", key).fetchone()
+            if old is not None:
+                self.connection.execute(f"DELETE FROM {table} WHERE {where}", key)
+                self.size -= old[0]
+            self.connection.execute(insert, row)
+        self.size += row[-2]
+        self._evict()
+
+    def _evict(self):
+        if self.size <= self.max_bytes:
+            return
+        target = self.max_bytes * 9 // 10
+        oldest = self.connection.execute(f"""
+            SELECT 'documents', hash, NULL, size, last_used FROM documents
+            UNION ALL SELECT 'distances', hash1, hash2, {DISTANCE_ROW_SIZE}, last_used FROM distances
+            UNION ALL SELECT 'results', rowid, NULL, size, last_used FROM results
+            ORDER BY last_used
+        """)
+        victims = {'documents': [], 'distances': [], 'results': []}
+        for table, key1, key2, size, _ in oldest:
+            if self.size <= target:
+                break
+            victims[table].append((key1, key2) if table == 'distances' else (key1,))
+            self.size -= size
+        oldest.close()
+        with self.connection:
+            self.connection.executemany("DELETE FROM documents WHERE hash = ?", victims['documents'])
+            self.connection.executemany("DELETE FROM distances WHERE hash1 = ? AND hash2 = ?", victims['distances'])
+            self.connection.executemany("DELETE FROM results WHERE rowid = ?", victims['results'])
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
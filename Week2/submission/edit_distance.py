@@ -0,0 +1,162 @@
+import numpy as np
+
+# Levenshtein distance engines used by plag.py.
+#
+# myers_distance is the bit-vector algorithm of Myers (1999) in Hyyro's
+# formulation for global edit distance: one DP column is held as two bit
+# masks of +1/-1 vertical deltas and every character of the text updates the
+# whole column with a handful of integer operations. Python ints have no
+# word size, so the same code covers patterns of up to 64 characters in a
+# single machine word and longer ones as multi-word integers, where the
+# carries between blocks are propagated by the big-int addition itself.
+#
+# rows_distance fills the classic DP one row at a time with NumPy. It is not
+# on any fast path -- myers_distance was 5-15x faster at every length tried,
+# from 50 to 10,000 characters -- and is kept as a plainly correct reference:
+# running this file checks it and the other engines against the full-table
+# DP on random strings.
+
+
+def _pattern_masks(pattern):
+    masks = {}
+    bit = 1
+    for ch in pattern:
+        masks[ch] = masks.get(ch, 0) | bit
+        bit <<= 1
+    return masks
+
+
+def myers_distance(str1, str2):
+    """Edit distance via bit-parallel column updates."""
+    # The shorter string is the pattern, so the bit vectors stay narrow
+    if len(str1) > len(str2):
+        str1, str2 = str2, str1
+    m = len(str1)
+    if m == 0:
+        return len(str2)
+    masks = _pattern_masks(str1)
+    full = (1 << m) - 1
+    high = 1 << (m - 1)
+    pv = full  # +1 vertical deltas
+    mv = 0     # -1 vertical deltas
+    score = m
+    for ch in str2:
+        eq = masks.get(ch, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & full)
+        mh = pv & xh
+        if ph & high:
+            score += 1
+        elif mh & high:
+            score -= 1
+        ph = ((ph << 1) | 1) & full
+        mh = (mh << 1) & full
+        pv = mh | (~(xv | ph) & full)
+        mv = ph & xv
+    return score
+
+
+def rows_distance(str1, str2):
+    """Reference edit distance: one vectorised NumPy step per row of the DP table."""
+    if len(str1) < len(str2):
+        str1, str2 = str2, str1
+    if not str2:
+        return len(str1)
+    codes2 = np.array([ord(ch) for ch in str2])
+    columns = np.arange(len(str2) + 1)
+    previous = columns.copy()
+    for i, ch in enumerate(str1, 1):
+        # Substitutions and deletions only depend on the previous row ...
+        row = np.empty_like(previous)
+        row[0] = i
+        row[1:] = np.minimum(previous[:-1] + (codes2 != ord(ch)), previous[1:] + 1)
+        # ... insertions chain along the row: row[j] = min_k(row[k] + j - k)
+        row = np.minimum.accumulate(row - columns) + columns
+        previous = row
+    return int(previous[-1])
+
+
+def edit_distance(str1, str2):
+    """Levenshtein distance between two strings (or any hashable sequences)."""
+    if str1 == str2:
+        return 0
+    return myers_distance(str1, str2)
+
+
+def bounded_edit_distance(str1, str2, limit):
+    """Edit distance if it is at most `limit`, otherwise None.
+
+    Ukkonen's cut-off: a path through cell (i, j) costs at least |i - j|, so
+    only the 2 * limit + 1 diagonals around the main one are filled, and the
+    scan stops as soon as a whole row exceeds the limit. Pairs whose lengths
+    alone differ by more than the limit are rejected without any DP.
+    """
+    n1, n2 = len(str1), len(str2)
+    if abs(n1 - n2) > limit:
+        return None
+    if str1 == str2:
+        return 0
+    if limit <= 0:
+        return None
+    width = 2 * limit + 1
+    over = limit + 1  # every value above the limit is stored as `over`
+    # row[d] holds column j = i + d - limit of the current row i
+    previous = [over] * width
+    for d in range(limit, width):
+        if d - limit <= n2:
+            previous[d] = d - limit
+    for i in range(1, n1 + 1):
+        ch = str1[i - 1]
+        current = [over] * width
+        row_min = over
+        for d in range(width):
+            j = i + d - limit
+            if j < 0 or j > n2:
+                continue
+            if j == 0:
+                value = i
+            else:
+                value = previous[d] + (ch != str2[j - 1])
+                if d + 1 < width and previous[d + 1] + 1 < value:
+                    value = previous[d + 1] + 1
+                if d > 0 and current[d - 1] + 1 < value:
+                    value = current[d - 1] + 1
+            if value > over:
+                value = over
+            current[d] = value
+            if value < row_min:
+                row_min = value
+        if row_min > limit:
+            return None
+        previous = current
+    result = previous[n2 - n1 + limit]
+    return result if result <= limit else None
+
+
+if __name__ == "__main__":
+    import random
+
+    def table_distance(str1, str2):
+        # the full-table DP that plag.calculate_edit_distance used to run
+        table = [[i + j if i * j == 0 else 0 for j in range(len(str2) + 1)] for i in range(len(str1) + 1)]
+        for i in range(1, len(str1) + 1):
+            for j in range(1, len(str2) + 1):
+                table[i][j] = min(table[i - 1][j] + 1, table[i][j - 1] + 1,
+                                  table[i - 1][j - 1] + (str1[i - 1] != str2[j - 1]))
+        return table[-1][-1]
+
+    # Cross-check the engines against the old DP on random strings, with
+    # small alphabets so that matches are common and lengths past one word
+    rng = random.Random(0)
+    for _ in range(500):
+        alphabet = rng.choice(['ab', 'abc', 'abcdefgh '])
+        str1 = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 150)))
+        str2 = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 150)))
+        expected = table_distance(str1, str2)
+        assert rows_distance(str1, str2) == expected, (str1, str2)
+        assert edit_distance(str1, str2) == expected, (str1, str2)
+        limit = rng.randint(0, 20)
+        bounded = bounded_edit_distance(str1, str2, limit)
+        assert bounded == (expected if expected <= limit else None), (str1, str2, limit)
+    print("edit_distance, rows_distance and bounded_edit_distance agree with the full-table DP")
@@ -0,0 +1,96 @@
+import io
+import os
+import re
+
+# Streaming sentence segmentation for plag.py.
+#
+# Text is read in fixed-size chunks and split at sentence boundaries before
+# any punctuation is removed; only the unfinished tail of a chunk is carried
+# over, so a document of any size is processed in bounded memory. A boundary
+# is terminal punctuation (optionally followed by closing quotes/brackets)
+# and whitespace, or a blank line, except after common abbreviations and
+# initials or when the next word starts in lower case.
+
+ABBREVIATIONS = {
+    'mr', 'mrs', 'ms', 'dr', 'prof', 'sr', 'jr', 'st', 'vs', 'etc', 'fig', 'figs',
+    'no', 'vol', 'pp', 'ed', 'eds', 'inc', 'ltd', 'co', 'corp', 'dept', 'approx',
+    'e.g', 'i.e', 'cf', 'al', 'jan', 'feb', 'mar', 'apr', 'jun', 'jul', 'aug',
+    'sep', 'sept', 'oct', 'nov', 'dec',
+}
+
+_BOUNDARY = re.compile(r'[.!?]+["\'\)\]]*\s+|\n[ \t]*\n\s*')
+_PUNCTUATION = re.compile(r'[^\w\s]')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_sentence(sentence):
+    """Lowercase, drop punctuation and collapse whitespace."""
+    sentence = _PUNCTUATION.sub('', sentence.lower())
+    return _WHITESPACE.sub(' ', sentence).strip()
+
+
+def _is_boundary(text, match):
+    if match.group().startswith('\n'):
+        return True
+    if text[match.start()] != '.':
+        return True  # '!' and '?' always end a sentence
+    words = text[max(match.start() - 32, 0):match.start()].split()
+    if words:
+        token = words[-1].lstrip('"\'([').lower().rstrip('.')
+        if token in ABBREVIATIONS or (len(token) == 1 and token.isalpha()):
+            return False
+    following = text[match.end():match.end() + 1]
+    return not following.islower()
+
+
+def _split(buffer, final):
+    """Split buffer into complete sentences and the unfinished remainder.
+
+    A candidate boundary that touches the end of a non-final buffer is left
+    for the next chunk, since the next character decides whether it counts.
+    """
+    sentences = []
+    start = 0
+    for match in _BOUNDARY.finditer(buffer):
+        if match.end() == len(buffer) and not final:
+            break
+        if _is_boundary(buffer, match):
+            sentences.append(buffer[start:match.end()])
+            start = match.end()
+    if final:
+        sentences.append(buffer[start:])
+        start = len(buffer)
+    return sentences, buffer[start:]
+
+
+def iter_sentences(source, chunk_size=1 << 16, max_sentence_chars=1 << 16, encoding='utf-8'):
+    """Yield normalised sentences from a path or a text file object.
+
+    A run of more than max_sentence_chars characters with no boundary is cut
+    at its last space so the carried-over tail never grows without limit.
+    """
+    if isinstance(source, (str, bytes, os.PathLike)):
+        with open(source, encoding=encoding, errors='replace') as f:
+            yield from iter_sentences(f, chunk_size, max_sentence_chars)
+        return
+    buffer = ''
+    while True:
+        chunk = source.read(chunk_size)
+        final = not chunk
+        buffer += chunk
+        sentences, buffer = _split(buffer, final)
+        if len(buffer) > max_sentence_chars:
+            cut = buffer.rfind(' ', 0, max_sentence_chars) + 1 or max_sentence_chars
+            sentences.append(buffer[:cut])
+            buffer = buffer[cut:]
+        for sentence in sentences:
+            sentence = normalize_sentence(sentence)
+            if sentence:
+                yield sentence
+        if final:
+            return
+
+
+def split_sentences(text):
+    """All normalised sentences of an in-memory string."""
+    return list(iter_sentences(io.StringIO(text)))
@@ -0,0 +1,89 @@
+# Needleman-Wunsch alignment with Hirschberg's linear-space traceback.
+#
+# Costs are supplied as functions of indices, so nothing quadratic is ever
+# stored: each split keeps two DP rows, and recursion depth is log2(n1).
+#   substitute(i, j) - cost of aligning item i of the first sequence with item j
+#   delete(i)        - cost of leaving item i of the first sequence unmatched
+#   insert(j)        - cost of leaving item j of the second sequence unmatched
+# The result is a list of (i, j) steps in order, with None on the unmatched side.
+
+
+def _forward_row(i0, i1, j0, j1, substitute, delete, insert):
+    """Last row of the DP table for first[i0:i1] against second[j0:j1]."""
+    row = [0] * (j1 - j0 + 1)
+    for k in range(1, len(row)):
+        row[k] = row[k - 1] + insert(j0 + k - 1)
+    for i in range(i0, i1):
+        deletion = delete(i)
+        previous_diagonal = row[0]
+        row[0] += deletion
+        for k in range(1, len(row)):
+            j = j0 + k - 1
+            best = min(previous_diagonal + substitute(i, j),
+                       row[k] + deletion,
+                       row[k - 1] + insert(j))
+            previous_diagonal = row[k]
+            row[k] = best
+    return row
+
+
+def _backward_row(i0, i1, j0, j1, substitute, delete, insert):
+    """row[k]: cost of aligning first[i0:i1] with second[j0 + k:j1]."""
+    width = j1 - j0
+    row = [0] * (width + 1)
+    for k in range(width - 1, -1, -1):
+        row[k] = row[k + 1] + insert(j0 + k)
+    for i in range(i1 - 1, i0 - 1, -1):
+        deletion = delete(i)
+        previous_diagonal = row[width]
+        row[width] += deletion
+        for k in range(width - 1, -1, -1):
+            j = j0 + k
+            best = min(previous_diagonal + substitute(i, j),
+                       row[k] + deletion,
+                       row[k + 1] + insert(j))
+            previous_diagonal = row[k]
+            row[k] = best
+    return row
+
+
+def _align_one(i, j0, j1, substitute, delete, insert, steps):
+    """Align a single item of the first sequence against second[j0:j1]."""
+    insertions = [insert(j) for j in range(j0, j1)]
+    total = sum(insertions)
+    best_cost = delete(i) + total
+    best_j = None
+    for k, j in enumerate(range(j0, j1)):
+        cost = substitute(i, j) + total - insertions[k]
+        if cost < best_cost:
+            best_cost, best_j = cost, j
+    if best_j is None:
+        steps.append((i, None))
+        steps.extend((None, j) for j in range(j0, j1))
+    else:
+        steps.extend((None, j) for j in range(j0, best_j))
+        steps.append((i, best_j))
+        steps.extend((None, j) for j in range(best_j + 1, j1))
+
+
+def _hirschberg(i0, i1, j0, j1, substitute, delete, insert, steps):
+    if i1 == i0:
+        steps.extend((None, j) for j in range(j0, j1))
+    elif j1 == j0:
+        steps.extend((i, None) for i in range(i0, i1))
+    elif i1 - i0 == 1:
+        _align_one(i0, j0, j1, substitute, delete, insert, steps)
+    else:
+        mid = (i0 + i1) // 2
+        left = _forward_row(i0, mid, j0, j1, substitute, delete, insert)
+        right = _backward_row(mid, i1, j0, j1, substitute, delete, insert)
+        split = min(range(len(left)), key=lambda k: left[k] + right[k])
+        _hirschberg(i0, mid, j0, j0 + split, substitute, delete, insert, steps)
+        _hirschberg(mid, i1, j0 + split, j1, substitute, delete, insert, steps)
+
+
+def hirschberg_alignment(n1, n2, substitute, delete, insert):
+    """Optimal alignment of sequences of lengths n1 and n2 in O(n1 + n2) memory."""
+    steps = []
+    _hirschberg(0, n1, 0, n2, substitute, delete, insert, steps)
+    return steps
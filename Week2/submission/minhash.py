@@ -0,0 +1,129 @@
+import pickle
+import random
+import re
+import zlib
+
+import numpy as np
+
+# MinHash signatures with LSH banding, used to pick which stored documents
+# are worth a full sentence alignment.
+#
+# A signature is num_perm minimum hash values over the set of word shingles
+# of a text; the fraction of equal positions between two signatures
+# estimates the Jaccard similarity of their shingle sets. The signature is
+# cut into `bands` bands of equal width and every band is a bucket key, so
+# two texts become candidates when any band matches exactly -- a lookup per
+# band instead of a comparison against every stored document. Both whole
+# documents and single sentences are indexed, so a few copied sentences in an
+# otherwise different submission still produce a candidate.
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+def shingles(text, size=3):
+    """Set of `size`-word shingles; shorter texts give a single shingle."""
+    words = re.findall(r'\w+', text.lower())
+    if len(words) <= size:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+class MinHashIndex:
+    def __init__(self, num_perm=128, bands=32, shingle_size=3, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        rng = random.Random(seed)
+        prime = int(_MERSENNE_PRIME)
+        self._a = np.array([rng.randrange(1, prime) for _ in range(num_perm)], dtype=np.uint64)
+        self._b = np.array([rng.randrange(0, prime) for _ in range(num_perm)], dtype=np.uint64)
+        self.documents = {}  # doc_id -> signature
+        self.sentences = {}  # (doc_id, sentence index) -> signature
+        self._document_buckets = [{} for _ in range(bands)]
+        self._sentence_buckets = [{} for _ in range(bands)]
+
+    def signature(self, text):
+        """MinHash signature of a text, or None if it has no words.
+
+        An empty shingle set would give the all-maximum signature, which
+        matches every other empty text in every band; such texts are left
+        out of the index and never queried.
+        """
+        tokens = shingles(text, self.shingle_size)
+        if not tokens:
+            return None
+        hashes = np.array([zlib.crc32(token.encode('utf-8')) for token in tokens], dtype=np.uint64)
+        # Products wrap modulo 2**64 before the reduction; that is still a
+        # good hash family and keeps everything in one vectorised expression
+        with np.errstate(over='ignore'):
+            permuted = (np.outer(self._a, hashes) + self._b[:, None]) % _MERSENNE_PRIME
+        return (permuted & _MAX_HASH).min(axis=1)
+
+    def _band_keys(self, signature):
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    @staticmethod
+    def similarity(signature1, signature2):
+        """Estimated Jaccard similarity of the texts behind two signatures."""
+        return float(np.mean(signature1 == signature2))
+
+    def add(self, doc_id, text, sentences=()):
+        """Index a document and, optionally, its preprocessed sentences."""
+        signature = self.signature(text)
+        if signature is not None:
+            self.documents[doc_id] = signature
+            for band, key in zip(self._document_buckets, self._band_keys(signature)):
+                band.setdefault(key, set()).add(doc_id)
+        for position, sentence in enumerate(sentences):
+            signature = self.signature(sentence)
+            if signature is None:
+                continue
+            self.sentences[(doc_id, position)] = signature
+            for band, key in zip(self._sentence_buckets, self._band_keys(signature)):
+                band.setdefault(key, set()).add((doc_id, position))
+
+    def _lookup(self, buckets, signature):
+        found = set()
+        for band, key in zip(buckets, self._band_keys(signature)):
+            found.update(band.get(key, ()))
+        return found
+
+    def query(self, text, sentences=(), min_similarity=0.0):
+        """Candidate documents for `text`, most similar first.
+
+        Returns (doc_id, estimated similarity) pairs. A document matched only
+        through one of `sentences` is reported with the best similarity of a
+        matching sentence pair.
+        """
+        signature = self.signature(text)
+        scores = {}
+        if signature is not None:
+            for doc_id in self._lookup(self._document_buckets, signature):
+                scores[doc_id] = self.similarity(signature, self.documents[doc_id])
+        for sentence in sentences:
+            sentence_signature = self.signature(sentence)
+            if sentence_signature is None:
+                continue
+            for doc_id, position in self._lookup(self._sentence_buckets, sentence_signature):
+                score = self.similarity(sentence_signature, self.sentences[(doc_id, position)])
+                if score > scores.get(doc_id, -1.0):
+                    scores[doc_id] = score
+        ranked = [(doc_id, score) for doc_id, score in scores.items() if score >= min_similarity]
+        ranked.sort(key=lambda item: item[1], reverse=True)
+        return ranked
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            index = pickle.load(f)
+        if not isinstance(index, cls):
+            raise ValueError(f"{path} does not contain a MinHashIndex")
+        return index
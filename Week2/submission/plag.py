@@ -1,89 +1,271 @@
 import heapq
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
-import re
 
-# Preprocess the input text: tokenize, normalize (lowercase, remove punctuation)
+from edit_distance import bounded_edit_distance, edit_distance
+from ingest import split_sentences
+from linear_alignment import hirschberg_alignment
+
+# Preprocess the input text: split into sentences, then normalize each one
+# (lowercase, remove punctuation); see ingest.py for files and streams
 def preprocess_input(text):
-    # Remove punctuation and split into sentences
-    text = re.sub(r'[^\w\s]', '', text)
-    sentences = text.lower().split('.')
-    return [s.strip() for s in sentences if s.strip()]
+    return split_sentences(text)
 
 # Calculate Levenshtein distance (edit distance) between two strings
+# (bit-parallel, see edit_distance.py)
 def calculate_edit_distance(str1, str2):
-    length1, length2 = len(str1), len(str2)
-    distance_matrix = np.zeros((length1 + 1, length2 + 1), dtype=int)
-
-    # Initialize distance matrix
-    for i in range(length1 + 1):
-        distance_matrix[i][0] = i
-    for j in range(length2 + 1):
-        distance_matrix[0][j] = j
-
-    # Populate the distance matrix
-    for i in range(1, length1 + 1):
-        for j in range(1, length2 + 1):
-            if str1[i - 1] == str2[j - 1]:
-                distance_matrix[i][j] = distance_matrix[i - 1][j - 1]  # No cost if characters match
-            else:
-                distance_matrix[i][j] = min(distance_matrix[i - 1][j] + 1,  # Deletion
-                                             distance_matrix[i][j - 1] + 1,  # Insertion
-                                             distance_matrix[i - 1][j - 1] + 1)  # Substitution
-    return distance_matrix[length1][length2]
-
-# Heuristic function to estimate the remaining edit distance between sentences
-def estimate_remaining_cost(pos1, pos2, sentences1, sentences2):
-    remaining_sentences1 = sentences1[pos1:]
-    remaining_sentences2 = sentences2[pos2:]
-    heuristic_cost = 0
-    # Use minimum possible edit distances between remaining sentences as the heuristic
-    for i in range(min(len(remaining_sentences1), len(remaining_sentences2))):
-        heuristic_cost += calculate_edit_distance(remaining_sentences1[i], remaining_sentences2[i])
-    return heuristic_cost
-
-# A* search algorithm to align sentences with minimal edit distance
-def a_star_sentence_alignment(sentences1, sentences2):
-    # Min-heap for A* search
-    open_set = []
-    heapq.heappush(open_set, (0, 0, 0, []))  # (total_cost, index1, index2, alignment_path)
-
-    # Set to track visited states
-    visited_states = set()
-
-    # Explore states until there are none left
-    while open_set:
-        total_cost, index1, index2, alignment_path = heapq.heappop(open_set)
+    return edit_distance(str1, str2)
 
-        # Check if the end of both documents is reached
-        if index1 == len(sentences1) and index2 == len(sentences2):
-            return alignment_path
+# Worker-side copy of the second document for compute_cost_matrix
+_row_targets = None
+
+def _init_cost_worker(sentences2):
+    global _row_targets
+    _row_targets = sentences2
+
+def _cost_row(sentence):
+    return [calculate_edit_distance(sentence, other) for other in _row_targets]
+
+def _cost_rows(sentences1, sentences2, workers=None):
+    if workers and workers > 1 and len(sentences1) > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_cost_worker,
+                                 initargs=(sentences2,)) as pool:
+            chunksize = max(1, len(sentences1) // (4 * workers))
+            rows = list(pool.map(_cost_row, sentences1, chunksize=chunksize))
+    else:
+        _init_cost_worker(sentences2)
+        rows = [_cost_row(sentence) for sentence in sentences1]
+    return np.array(rows, dtype=int).reshape(len(sentences1), len(sentences2))
+
+# Edit distance of every sentence pair, computed once per alignment. With a
+# cache (see cache.PlagiarismCache) only rows holding an unknown pair are
+# computed, and their new distances are stored for the next run.
+def compute_cost_matrix(sentences1, sentences2, workers=None, cache=None):
+    if cache is None:
+        return _cost_rows(sentences1, sentences2, workers)
+    matrix = cache.distances(sentences1, sentences2)
+    unknown = matrix < 0
+    missing = np.flatnonzero(unknown.any(axis=1))
+    if len(missing):
+        matrix[missing] = _cost_rows([sentences1[i] for i in missing], sentences2, workers)
+        cache.put_distances((sentences1[i], sentences2[j], matrix[i, j]) for i, j in zip(*np.nonzero(unknown)))
+    return matrix
+
+# Lower bounds on the cost of the sentences from each position onwards.
+# Every remaining sentence of a document is either skipped (cost = its
+# length) or aligned to some sentence of the other document, so it costs at
+# least the smaller of the two; summing these per document and taking the
+# larger sum never overestimates.
+def remaining_cost_bounds(cost_matrix, delete_costs, insert_costs):
+    n1, n2 = cost_matrix.shape
+    row_min = np.minimum(cost_matrix.min(axis=1), delete_costs) if n2 else delete_costs
+    col_min = np.minimum(cost_matrix.min(axis=0), insert_costs) if n1 else insert_costs
+    suffix1 = np.concatenate([np.cumsum(row_min[::-1])[::-1], [0]]).astype(int)
+    suffix2 = np.concatenate([np.cumsum(col_min[::-1])[::-1], [0]]).astype(int)
+    return suffix1.tolist(), suffix2.tolist()
+
+# A* heuristic: lower bound on the cost left from lattice node (pos1, pos2),
+# from the suffix sums of remaining_cost_bounds
+def remaining_cost_bound(pos1, pos2, suffix1, suffix2):
+    return max(suffix1[pos1], suffix2[pos2])
+
+# Back-pointers of the alignment search: the move that reached a lattice
+# node, from which its predecessor follows
+_START, _ALIGN, _SKIP1, _SKIP2 = 0, 1, 2, 3
+_UNKNOWN = (1 << 62)  # g of a node not reached yet
+
+def _trace_alignment(moves, width, sentences1, sentences2, costs, delete_costs, insert_costs):
+    path = []
+    node = len(moves) - 1
+    while moves[node] != _START:
+        i, j = divmod(node, width)
+        move = moves[node]
+        if move == _ALIGN:
+            path.append((sentences1[i - 1], sentences2[j - 1], costs[i - 1][j - 1]))
+            node -= width + 1
+        elif move == _SKIP1:
+            path.append((sentences1[i - 1], "", delete_costs[i - 1]))
+            node -= width
+        else:
+            path.append(("", sentences2[j - 1], insert_costs[j - 1]))
+            node -= 1
+    path.reverse()
+    return path
+
+# A* search algorithm to align sentences with minimal edit distance.
+#
+# Nodes are cells (i, j) of the alignment lattice, numbered i * (n2 + 1) + j;
+# the best g and the move that reached each node live in preallocated arrays
+# and the heap holds (f, g, node) triples, so the path is rebuilt once at the
+# end instead of being copied on every push.
+#
+# beam_width turns the search into a beam search over the anti-diagonals
+# i + j: every lattice move goes to a later diagonal, so each one is pruned
+# to the beam_width nodes of lowest f before it is expanded, which bounds the
+# nodes kept at any time. The result is then approximate; the smallest f of
+# a pruned node is a lower bound on the cost of any path through it, so the
+# optimum is at least min(found cost, that f). stats (common.stats.SearchStats)
+# receives the found cost, that lower bound and their difference in
+# stats.extra as 'alignment_cost', 'lower_bound' and 'error_bound'.
+def a_star_sentence_alignment(sentences1, sentences2, workers=None, cache=None, beam_width=None, stats=None):
+    # All g and h values come from tables built up front
+    n1, n2 = len(sentences1), len(sentences2)
+    delete_costs = np.array([len(s) for s in sentences1], dtype=int)  # edit distance to ""
+    insert_costs = np.array([len(s) for s in sentences2], dtype=int)
+    cost_matrix = compute_cost_matrix(sentences1, sentences2, workers, cache)
+    suffix1, suffix2 = remaining_cost_bounds(cost_matrix, delete_costs, insert_costs)
+    costs = cost_matrix.tolist()
+    delete_costs = delete_costs.tolist()
+    insert_costs = insert_costs.tolist()
+
+    width = n2 + 1
+    goal = (n1 + 1) * width - 1
+    best_g = array('q', [_UNKNOWN]) * (goal + 1)
+    moves = bytearray(goal + 1)
+    best_g[0] = 0
+    if stats is not None:
+        stats.start()
+    try:
+        if beam_width:
+            lower_bound = _beam_search(n1, n2, beam_width, best_g, moves, costs, delete_costs, insert_costs,
+                                       suffix1, suffix2, stats)
+        else:
+            lower_bound = _a_star_search(n1, n2, best_g, moves, costs, delete_costs, insert_costs,
+                                         suffix1, suffix2, stats)
+    finally:
+        if stats is not None:
+            stats.stop()
+    found = best_g[goal]
+    if stats is not None:
+        lower_bound = min(found, lower_bound)
+        stats.extra.update(alignment_cost=found, lower_bound=lower_bound, error_bound=found - lower_bound)
+    return _trace_alignment(moves, width, sentences1, sentences2, costs, delete_costs, insert_costs)
+
+# Relax the up to three moves out of node (i, j); calls push(child, g) for
+# every child whose best g improved
+def _relax(node, i, j, n1, n2, width, best_g, moves, costs, delete_costs, insert_costs, push):
+    g = best_g[node]
+    # Align current sentences from both documents
+    if i < n1 and j < n2:
+        child, new_g = node + width + 1, g + costs[i][j]
+        if new_g < best_g[child]:
+            best_g[child], moves[child] = new_g, _ALIGN
+            push(child, new_g)
+    # Skip current sentence in sentences1
+    if i < n1:
+        child, new_g = node + width, g + delete_costs[i]
+        if new_g < best_g[child]:
+            best_g[child], moves[child] = new_g, _SKIP1
+            push(child, new_g)
+    # Skip current sentence in sentences2
+    if j < n2:
+        child, new_g = node + 1, g + insert_costs[j]
+        if new_g < best_g[child]:
+            best_g[child], moves[child] = new_g, _SKIP2
+            push(child, new_g)
+
+def _a_star_search(n1, n2, best_g, moves, costs, delete_costs, insert_costs, suffix1, suffix2, stats):
+    width = n2 + 1
+    goal = len(moves) - 1
+    closed = bytearray(len(moves))
+    # Min-heap of (f, g, node); entries whose g is no longer the node's best are stale
+    open_set = [(remaining_cost_bound(0, 0, suffix1, suffix2), 0, 0)]
 
+    def push(child, g):
+        i, j = divmod(child, width)
+        heapq.heappush(open_set, (g + remaining_cost_bound(i, j, suffix1, suffix2), g, child))
+
+    expanded = 0
+    while open_set:
+        _, g, node = heapq.heappop(open_set)
+        # Check if the end of both documents is reached
+        if node == goal:
+            break
         # Skip already explored state
-        if (index1, index2) in visited_states:
+        if closed[node] or g != best_g[node]:
             continue
-        visited_states.add((index1, index2))
-
-        # Align current sentences from both documents
-        if index1 < len(sentences1) and index2 < len(sentences2):
-            cost = calculate_edit_distance(sentences1[index1], sentences2[index2])
-            new_path = alignment_path + [(sentences1[index1], sentences2[index2], cost)]
-            g_cost = total_cost + cost
-            h_cost = estimate_remaining_cost(index1 + 1, index2 + 1, sentences1, sentences2)
-            heapq.heappush(open_set, (g_cost + h_cost, index1 + 1, index2 + 1, new_path))
-
-        # Skip current sentence in sentences1
-        if index1 < len(sentences1):
-            g_cost = total_cost + calculate_edit_distance(sentences1[index1], "")
-            new_path = alignment_path + [(sentences1[index1], "", g_cost)]
-            heapq.heappush(open_set, (g_cost, index1 + 1, index2, new_path))
-
-        # Skip current sentence in sentences2
-        if index2 < len(sentences2):
-            g_cost = total_cost + calculate_edit_distance("", sentences2[index2])
-            new_path = alignment_path + [("", sentences2[index2], g_cost)]
-            heapq.heappush(open_set, (g_cost, index1, index2 + 1, new_path))
-
-    return None
+        closed[node] = 1
+        expanded += 1
+        if stats is not None:
+            stats.expand(node, len(open_set) + 1, expanded)
+        i, j = divmod(node, width)
+        _relax(node, i, j, n1, n2, width, best_g, moves, costs, delete_costs, insert_costs, push)
+    return best_g[goal]  # exact: the lower bound is the cost itself
+
+def _beam_search(n1, n2, beam_width, best_g, moves, costs, delete_costs, insert_costs, suffix1, suffix2, stats):
+    width = n2 + 1
+    diagonals = [[] for _ in range(n1 + n2 + 1)]  # nodes reached, by i + j
+    diagonals[0].append(0)
+
+    def push(child, g):
+        i, j = divmod(child, width)
+        diagonals[i + j].append(child)
+
+    def f(node):
+        i, j = divmod(node, width)
+        return best_g[node] + remaining_cost_bound(i, j, suffix1, suffix2)
+
+    lower_bound = _UNKNOWN
+    expanded = 0
+    for d, layer in enumerate(diagonals):
+        layer = list(dict.fromkeys(layer))  # a node is pushed once per improvement
+        if len(layer) > beam_width:
+            layer.sort(key=f)
+            lower_bound = min(lower_bound, f(layer[beam_width]))
+            for node in layer[beam_width:]:
+                best_g[node] = _UNKNOWN  # pruned: never expanded, never on the path
+            layer = layer[:beam_width]
+        diagonals[d] = None
+        for node in layer:
+            expanded += 1
+            if stats is not None:
+                stats.expand(node, len(layer), expanded)
+            i, j = divmod(node, width)
+            _relax(node, i, j, n1, n2, width, best_g, moves, costs, delete_costs, insert_costs, push)
+    return lower_bound
+
+# Needleman-Wunsch alignment with Hirschberg's traceback: same costs and
+# result format as a_star_sentence_alignment, but memory stays linear in the
+# number of sentences. Time does not: nothing is cached between splits, so
+# every split recomputes the edit distances of its cells, about 2 * n1 * n2
+# full sentence distances in all. That is fine for documents of a few
+# thousand sentences; at tens of thousands it is billions of distances.
+#
+# `limit` is an approximate mode, off by default: pairs are priced with
+# bounded_edit_distance, which rejects most of them on length or after a few
+# rows, and a pair over the limit costs as much as skipping both sentences.
+# That changes which pairs the optimal alignment picks, so the cases found
+# can differ from the exact engines' (typically a few more short matches).
+def linear_space_sentence_alignment(sentences1, sentences2, limit=None):
+    if limit is None:
+        substitute = lambda i, j: calculate_edit_distance(sentences1[i], sentences2[j])
+    else:
+        def substitute(i, j):
+            cost = bounded_edit_distance(sentences1[i], sentences2[j], limit)
+            return len(sentences1[i]) + len(sentences2[j]) if cost is None else cost
+    delete = lambda i: len(sentences1[i])
+    insert = lambda j: len(sentences2[j])
+    steps = hirschberg_alignment(len(sentences1), len(sentences2), substitute, delete, insert)
+    alignment = []
+    for i, j in steps:
+        if i is None:
+            alignment.append(("", sentences2[j], insert(j)))
+        elif j is None:
+            alignment.append((sentences1[i], "", delete(i)))
+        else:
+            alignment.append((sentences1[i], sentences2[j], substitute(i, j)))
+    return alignment
+
+ALIGNMENT_METHODS = {
+    'astar': a_star_sentence_alignment,
+    'linear': linear_space_sentence_alignment,
+}
+
+# Align two documents with the chosen engine ('astar' or 'linear'); extra
+# keyword options (workers, cache for astar, limit for linear) go to the engine
+def align_sentences(sentences1, sentences2, method='astar', **options):
+    return ALIGNMENT_METHODS[method](sentences1, sentences2, **options)
 
 # Function to identify potential plagiarism based on low edit distances
 def identify_plagiarism(alignment_results, threshold=5):
@@ -93,6 +275,39 @@ def identify_plagiarism(alignment_results, threshold=5):
             detected_cases.append((sent1, sent2, cost))
     return detected_cases
 
+# All sentence pairs within `threshold` edits of each other, without an
+# alignment. Only the yes/no decision matters here, so the bounded distance
+# rejects most pairs from their lengths or after a few rows of the band.
+def find_similar_sentences(sentences1, sentences2, threshold=5):
+    detected_cases = []
+    for sent1 in sentences1:
+        for sent2 in sentences2:
+            cost = bounded_edit_distance(sent1, sent2, threshold)
+            if cost is not None:
+                detected_cases.append((sent1, sent2, cost))
+    return detected_cases
+
+# Compare a submission against an indexed corpus (see minhash.MinHashIndex).
+# Only the documents the index returns as candidates are aligned; `corpus`
+# maps each indexed doc_id to its text. method='pairs' skips the alignment
+# and reports every sentence pair under the threshold. A cache (see
+# cache.PlagiarismCache) keeps sentence lists and A* edit distances between
+# runs. Returns {doc_id: plagiarism cases}.
+def check_against_corpus(text, index, corpus, threshold=5, method='astar', min_similarity=0.0, cache=None):
+    preprocess = preprocess_input if cache is None else cache.sentences
+    options = {'cache': cache} if cache is not None and method == 'astar' else {}
+    sentences = preprocess(text)
+    results = {}
+    for doc_id, _ in index.query(text, sentences, min_similarity):
+        other = preprocess(corpus[doc_id])
+        if method == 'pairs':
+            cases = find_similar_sentences(sentences, other, threshold)
+        else:
+            cases = identify_plagiarism(align_sentences(sentences, other, method, **options), threshold)
+        if cases:
+            results[doc_id] = cases
+    return results
+
 # Main execution block
 if __name__ == "__main__":
     # Sample documents
@@ -104,7 +319,7 @@ if __name__ == "__main__":
     sentences2 = preprocess_input(document2)
 
     # Perform sentence alignment using A* search
-    alignment_results = a_star_sentence_alignment(sentences1, sentences2)
+    alignment_results = align_sentences(sentences1, sentences2, method='astar')
 
     # Print aligned sentences along with their edit distances
     print("Alignment Results:")
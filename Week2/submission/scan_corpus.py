@@ -0,0 +1,216 @@
+import argparse
+import csv
+import itertools
+import os
+import sys
+from array import array
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+
+from cache import PlagiarismCache, file_key
+from ingest import iter_sentences
+from plag import align_sentences, find_similar_sentences, identify_plagiarism
+
+# Compare every pair of documents in a directory across a process pool.
+#
+# All documents are segmented once and their sentences are packed into
+# shared memory: one block holds the UTF-8 text of every sentence back to
+# back, another holds two uint64 tables -- the byte offset of each sentence
+# and the index of each document's first sentence. Workers attach to both
+# blocks when they start, so a task is just a pair of document numbers and
+# nothing about the corpus is pickled per task. Matches are written to the
+# CSV as soon as each pair finishes.
+#
+# With --cache, documents are keyed by a hash of their contents: sentence
+# lists and the cases of every compared pair are kept in a SQLite file, so a
+# re-run after adding one submission only segments and compares the new one.
+
+CSV_FIELDS = ['document1', 'document2', 'sentence1', 'sentence2', 'edit_distance']
+
+
+class SharedCorpus:
+    """Sentences of many documents laid out in two shared memory blocks."""
+
+    def __init__(self, text_block, index_block, num_sentences, num_documents, owner=False):
+        self.text_block = text_block
+        self.index_block = index_block
+        self.num_sentences = num_sentences
+        self.num_documents = num_documents
+        self.owner = owner
+        index = index_block.buf.cast('Q')
+        self.offsets = index[:num_sentences + 1]
+        self.doc_starts = index[num_sentences + 1:num_sentences + num_documents + 2]
+
+    @classmethod
+    def create(cls, documents):
+        """Pack a list of sentence lists into new shared memory blocks."""
+        offsets = array('Q', [0])
+        doc_starts = array('Q', [0])
+        encoded = []
+        for sentences in documents:
+            for sentence in sentences:
+                data = sentence.encode('utf-8')
+                encoded.append(data)
+                offsets.append(offsets[-1] + len(data))
+            doc_starts.append(len(offsets) - 1)
+        text = b''.join(encoded)
+        text_block = shared_memory.SharedMemory(create=True, size=max(len(text), 1))
+        text_block.buf[:len(text)] = text
+        index = offsets + doc_starts
+        index_block = shared_memory.SharedMemory(create=True, size=max(len(index) * index.itemsize, 1))
+        index_block.buf[:len(index) * index.itemsize] = index.tobytes()
+        return cls(text_block, index_block, len(offsets) - 1, len(documents), owner=True)
+
+    @classmethod
+    def attach(cls, text_name, index_name, num_sentences, num_documents):
+        return cls(shared_memory.SharedMemory(name=text_name),
+                   shared_memory.SharedMemory(name=index_name),
+                   num_sentences, num_documents)
+
+    def handle(self):
+        """Arguments for attach() in another process."""
+        return (self.text_block.name, self.index_block.name, self.num_sentences, self.num_documents)
+
+    def sentences(self, document):
+        buf = self.text_block.buf
+        offsets = self.offsets
+        first, last = self.doc_starts[document], self.doc_starts[document + 1]
+        return [bytes(buf[offsets[k]:offsets[k + 1]]).decode('utf-8') for k in range(first, last)]
+
+    def close(self):
+        self.offsets.release()
+        self.doc_starts.release()
+        self.text_block.close()
+        self.index_block.close()
+        if self.owner:
+            self.text_block.unlink()
+            self.index_block.unlink()
+
+
+_corpus = None  # worker-side SharedCorpus
+
+
+def _init_worker(handle):
+    global _corpus
+    _corpus = SharedCorpus.attach(*handle)
+
+
+def compare_pair(i, j, threshold, method):
+    sentences1 = _corpus.sentences(i)
+    sentences2 = _corpus.sentences(j)
+    if method == 'pairs':
+        return i, j, find_similar_sentences(sentences1, sentences2, threshold)
+    if method == 'bounded':
+        # approximate: linear alignment with pairs over the threshold capped
+        alignment = align_sentences(sentences1, sentences2, 'linear', limit=threshold)
+    else:
+        alignment = align_sentences(sentences1, sentences2, method)
+    return i, j, identify_plagiarism(alignment, threshold)
+
+
+def _segment(path):
+    return list(iter_sentences(path))
+
+
+def list_documents(directory, suffix=None):
+    names = sorted(name for name in os.listdir(directory)
+                   if os.path.isfile(os.path.join(directory, name)) and (suffix is None or name.endswith(suffix)))
+    return [os.path.join(directory, name) for name in names]
+
+
+def _load_documents(paths, pool, workers, cache=None, keys=None):
+    documents = [None] * len(paths)
+    if cache is not None:
+        for k, key in enumerate(keys):
+            documents[k] = cache.get_document(key)
+    todo = [k for k, sentences in enumerate(documents) if sentences is None]
+    chunksize = max(1, len(todo) // (4 * workers))
+    for k, sentences in zip(todo, pool.map(_segment, [paths[k] for k in todo], chunksize=chunksize)):
+        documents[k] = sentences
+        if cache is not None:
+            cache.put_document(keys[k], sentences)
+    return documents
+
+
+def scan(paths, output, threshold=5, method='linear', workers=None, cache=None):
+    """Write every plagiarism case between any two of `paths` to `output` (CSV).
+
+    Returns the number of document pairs compared. Pairs found in `cache` (a
+    cache.PlagiarismCache) are written from it without being compared again.
+    """
+    workers = workers or os.cpu_count()
+    keys = [file_key(path) for path in paths] if cache is not None else None
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        documents = _load_documents(paths, pool, workers, cache, keys)
+    corpus = SharedCorpus.create(documents)
+    del documents
+    names = [os.path.basename(path) for path in paths]
+    writer = csv.writer(output)
+    writer.writerow(CSV_FIELDS)
+    compared = 0
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(corpus.handle(),)) as pool:
+            pairs = itertools.combinations(range(len(paths)), 2)
+            pending = set()
+            exhausted = False
+            while pending or not exhausted:
+                while not exhausted and len(pending) < 4 * workers:
+                    pair = next(pairs, None)
+                    if pair is None:
+                        exhausted = True
+                        break
+                    i, j = pair
+                    cases = cache.get_result(keys[i], keys[j], method, threshold) if cache is not None else None
+                    if cases is None:
+                        pending.add(pool.submit(compare_pair, i, j, threshold, method))
+                    else:
+                        for sent1, sent2, cost in cases:
+                            writer.writerow([names[i], names[j], sent1, sent2, cost])
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    i, j, cases = future.result()
+                    compared += 1
+                    if cache is not None:
+                        cache.put_result(keys[i], keys[j], method, threshold, cases)
+                    for sent1, sent2, cost in cases:
+                        writer.writerow([names[i], names[j], sent1, sent2, cost])
+                    output.flush()
+    finally:
+        corpus.close()
+    return compared
+
+
+def main():
+    parser = argparse.ArgumentParser(description="All-pairs plagiarism scan over a directory")
+    parser.add_argument('directory', help="directory of text documents")
+    parser.add_argument('-o', '--output', default='-', help="CSV file to write, '-' for stdout")
+    parser.add_argument('--suffix', default=None, help="only read files ending with this, e.g. .txt")
+    parser.add_argument('--threshold', type=int, default=5, help="largest edit distance reported")
+    parser.add_argument('--method', choices=['astar', 'linear', 'bounded', 'pairs'], default='linear',
+                        help="alignment engine, 'bounded' for a faster approximate linear alignment "
+                             "(see plag.linear_space_sentence_alignment), or 'pairs' to report every "
+                             "close sentence pair")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--cache', default=None, help="SQLite file reused across runs")
+    parser.add_argument('--cache-size', type=int, default=256, help="cache size bound in MiB")
+    args = parser.parse_args()
+
+    paths = list_documents(args.directory, args.suffix)
+    cache = PlagiarismCache(args.cache, args.cache_size << 20) if args.cache else None
+    try:
+        if args.output == '-':
+            compared = scan(paths, sys.stdout, args.threshold, args.method, args.workers, cache)
+        else:
+            with open(args.output, 'w', newline='', encoding='utf-8') as f:
+                compared = scan(paths, f, args.threshold, args.method, args.workers, cache)
+    finally:
+        if cache is not None:
+            cache.close()
+    print(f"Compared {compared} document pairs from {len(paths)} files", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
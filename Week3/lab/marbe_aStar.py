@@ -1,49 +1,55 @@
 import heapq
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from common.stats import SearchStats
+from marble_board import BitBoard
+from marble_dfs import solve
+from marble_pagoda import PagodaPruner
+from marble_parallel import parallel_solve
 
 class MarbleSolitaire:
     def __init__(self, board):
-        self.board = board
-        self.size = len(board)
-        self.center = (self.size // 2, self.size // 2)  # Center position of the board
+        # board: a marble_board.BitBoard (any geometry), or a 7x7 list of
+        # lists of 0/1 on the English cross
+        self.board = board if isinstance(board, BitBoard) else BitBoard.from_rows(board)
+        self.pagoda_values = None  # set by searches run with a PagodaPruner
 
     def get_possible_moves(self):
         """Find all valid moves (jump over a marble) for the current board state."""
-        moves = []
-        for i in range(self.size):
-            for j in range(self.size):
-                if self.board[i][j] == 1:  # If there's a marble
-                    # Check all four possible jump directions (up, down, left, right)
-                    for di, dj in [(-2, 0), (2, 0), (0, -2), (0, 2)]:
-                        ni, nj = i + di, j + dj
-                        if 0 <= ni < self.size and 0 <= nj < self.size:
-                            if self.board[ni][nj] == 0 and self.board[i + di // 2][j + dj // 2] == 1:
-                                # Valid move (from i,j to ni,nj, jumping over the marble in between)
-                                moves.append((i, j, ni, nj))
-        return moves
+        return self.board.moves()
 
     def make_move(self, move):
         """Perform the move and return a new board state."""
-        from_x, from_y, to_x, to_y = move
-        new_board = [row[:] for row in self.board]
-        new_board[from_x][from_y] = 0
-        new_board[to_x][to_y] = 1
-        new_board[(from_x + to_x) // 2][(from_y + to_y) // 2] = 0  # Remove jumped-over marble
-        return MarbleSolitaire(new_board)
+        return MarbleSolitaire(self.board.apply(move))
 
     def is_goal(self):
-        """Check if the goal state is reached: one marble left at the center."""
-        return sum(row.count(1) for row in self.board) == 1 and self.board[self.center[0]][self.center[1]] == 1
+        """Check if the goal state is reached: the marbles left fill exactly the target holes."""
+        return self.board.is_goal()
 
     def heuristic(self):
         """Heuristic: number of marbles left."""
-        return sum(row.count(1) for row in self.board)
+        return self.board.marbles()
 
     def __lt__(self, other):
         """Comparison operator for heapq to avoid errors when heuristic values are equal."""
-        return True  # Arbitrarily return True since they can't really be compared directly
-
-    def a_star_search(self):
-        """Perform A* search to solve the Marble Solitaire puzzle."""
+        return self.board.bits < other.board.bits
+
+    def a_star_search(self, stats=None, pagoda=None):
+        """Perform A* search to solve the Marble Solitaire puzzle.
+
+        stats: optional common.stats.SearchStats filled in during the search.
+        pagoda: optional marble_pagoda.PagodaPruner; children it proves
+        hopeless are not queued, and their count goes to
+        stats.extra['pagoda_pruned'].
+        """
+        if stats is not None:
+            stats.start()
+        pruned = 0
+        if pagoda is not None:
+            self.pagoda_values = pagoda.values(self.board.bits)
+            pruned = pagoda.pruned
         open_list = []
         heapq.heappush(open_list, (self.heuristic(), self, []))
         visited = set()
@@ -51,50 +57,109 @@ class MarbleSolitaire:
         while open_list:
             _, node, path = heapq.heappop(open_list)
 
-            if tuple(map(tuple, node.board)) in visited:
+            key = node.board.canonical()
+            if key in visited:
                 continue
 
-            visited.add(tuple(map(tuple, node.board)))
+            visited.add(key)
+            if stats is not None:
+                stats.expand(node, len(open_list) + 1, len(visited))
 
             if node.is_goal():
+                if stats is not None:
+                    if pagoda is not None:
+                        stats.extra['pagoda_pruned'] = pagoda.pruned - pruned
+                    stats.stop()
                 return path
 
-            for move in node.get_possible_moves():
+            if stats is None:
+                moves = node.get_possible_moves()
+            else:
+                moves = stats.successors(node.get_possible_moves)
+            for move in moves:
                 child_node = node.make_move(move)
+                if pagoda is not None:
+                    child_node.pagoda_values = pagoda.update(node.pagoda_values, move)
+                    if pagoda.hopeless(child_node.pagoda_values):
+                        continue
                 new_path = path + [move]
                 heapq.heappush(open_list, (len(new_path) + child_node.heuristic(), child_node, new_path))
 
+        if stats is not None:
+            if pagoda is not None:
+                stats.extra['pagoda_pruned'] = pagoda.pruned - pruned
+            stats.stop()
         return None  # No solution found
 
+    def depth_first_search(self, dead=None, stats=None, pagoda=None):
+        """Solve with the depth-first solver of marble_dfs.py.
+
+        Every move removes one marble, so len(path) + marbles is the same for
+        all nodes and a_star_search has nothing to order by; this mode instead
+        remembers positions proven dead (dead: a marble_dfs.DeadPositions,
+        shared between calls to reuse what earlier searches found).
+        """
+        return solve(self.board.bits, self.board.geometry, dead, stats, pagoda)
+
+    def parallel_search(self, plies=4, workers=None, stats=None, pagoda=None):
+        """Solve across a process pool with marble_parallel.parallel_solve.
+
+        The first `plies` jumps are expanded here and each position reached
+        (one per symmetry class) is searched depth-first in a worker; all
+        workers share a table of dead positions and stop at the first
+        solution.
+        """
+        return parallel_solve(self.board.bits, self.board.geometry, plies, workers, stats=stats, pagoda=pagoda)
+
 
 def print_board(board):
-    for row in board:
+    for row in board.to_rows():
         print(" ".join(str(x) for x in row))
     print()
 
 
-# Example initial board setup (7x7 cross pattern)
-initial_board = [
-    [0, 0, 1, 1, 1, 0, 0],
-    [0, 0, 1, 1, 1, 0, 0],
-    [1, 1, 1, 1, 1, 1, 1],
-    [1, 1, 1, 0, 1, 1, 1],
-    [1, 1, 1, 1, 1, 1, 1],
-    [0, 0, 1, 1, 1, 0, 0],
-    [0, 0, 1, 1, 1, 0, 0]
-]
-
-game = MarbleSolitaire(initial_board)
-solution = game.a_star_search()
-
-if solution:
-    print("Solution found!")
-    current_board = MarbleSolitaire(initial_board)
-    print_board(current_board.board)
-
-    for move in solution:
-        current_board = current_board.make_move(move)
-        print(f"Move: {move}")
+if __name__ == "__main__":
+    # --dfs runs the depth-first solver instead of the (very slow) A*,
+    # --parallel the same solver on subtrees across all cores;
+    # --pagoda prunes positions that pagoda functions prove hopeless;
+    # --stats prints search statistics
+    use_dfs = '--dfs' in sys.argv[1:]
+    use_parallel = '--parallel' in sys.argv[1:]
+    show_stats = '--stats' in sys.argv[1:]
+    pagoda = PagodaPruner() if '--pagoda' in sys.argv[1:] else None
+
+    # Example initial board setup (7x7 cross pattern)
+    initial_board = [
+        [0, 0, 1, 1, 1, 0, 0],
+        [0, 0, 1, 1, 1, 0, 0],
+        [1, 1, 1, 1, 1, 1, 1],
+        [1, 1, 1, 0, 1, 1, 1],
+        [1, 1, 1, 1, 1, 1, 1],
+        [0, 0, 1, 1, 1, 0, 0],
+        [0, 0, 1, 1, 1, 0, 0]
+    ]
+
+    game = MarbleSolitaire(initial_board)
+    if use_parallel:
+        stats = SearchStats('parallel dfs') if show_stats else None
+        solution = game.parallel_search(stats=stats, pagoda=pagoda)
+    elif use_dfs:
+        stats = SearchStats('dfs') if show_stats else None
+        solution = game.depth_first_search(stats=stats, pagoda=pagoda)
+    else:
+        stats = SearchStats('a*') if show_stats else None
+        solution = game.a_star_search(stats, pagoda)
+
+    if solution:
+        print("Solution found!")
+        current_board = MarbleSolitaire(initial_board)
         print_board(current_board.board)
-else:
-    print("No solution found.")
+
+        for move in solution:
+            current_board = current_board.make_move(move)
+            print(f"Move: {move}")
+            print_board(current_board.board)
+    else:
+        print("No solution found.")
+    if stats is not None:
+        print(stats.report())
@@ -0,0 +1,256 @@
+import json
+import os
+import zlib
+
+# Bitboards for marble (peg) solitaire on any board described in boards.json.
+#
+# A board spec gives the layout as strings ('o' a hole holding a marble at
+# the start, '.' an empty hole, anything else no hole), the lattice and the
+# target: the holes that should keep a marble at the end. Geometry compiles a
+# spec once:
+#
+#   - hole k is bit k of an int, holes numbered row by row;
+#   - every legal jump becomes masks: `need` (the from and over holes, which
+#     must hold marbles), `to` (which must be empty) and `flip` (all three,
+#     so that bits ^ flip plays it), in one flat table, so move generation
+#     is a walk over that table. Moves keep the (from_row, from_col, to_row,
+#     to_col) form the searches print;
+#   - the symmetries are the linear maps of the lattice that carry the set
+#     of holes onto itself and fix the target. canonical() maps a position to
+#     the smallest int among its images, applied a byte at a time through
+#     256-entry lookup tables, so a visited set keyed on it holds one entry
+#     per equivalence class;
+#   - position classes (the "rule of three"): for a linear form f that is
+#     non-zero mod 3 on every jump direction, the three holes of a jump lie
+#     in the three classes f = 0, 1, 2 (mod 3), so every jump flips the parity
+#     of all three marble counts. Their pairwise differences never change,
+#     and a target with other values is unreachable.
+#
+# ENGLISH, the English cross, is the default board of the Week3 searches.
+
+BOARDS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'boards.json')
+
+# Step directions of each lattice; a jump moves two steps along one of them,
+# either way. The triangular lattice is stored sheared onto rows and columns.
+LATTICES = {
+    'square': ((1, 0), (0, 1)),
+    'triangular': ((1, 0), (0, 1), (1, 1)),
+}
+
+
+class Geometry:
+    def __init__(self, name, layout, lattice='square', target=None):
+        if lattice not in LATTICES:
+            raise ValueError(f"unknown lattice {lattice!r}")
+        self.name = name
+        self.lattice = lattice
+        self.directions = LATTICES[lattice]
+        self.rows = len(layout)
+        self.cols = max(len(row) for row in layout)
+        self.holes = [(r, c) for r, row in enumerate(layout) for c, cell in enumerate(row) if cell in 'o.']
+        self.index = {cell: k for k, cell in enumerate(self.holes)}
+        self.full = (1 << len(self.holes)) - 1
+        self.start = self.mask((r, c) for r, row in enumerate(layout) for c, cell in enumerate(row) if cell == 'o')
+        if target is None:
+            target = [(self.rows // 2, self.cols // 2)]
+        self.target = self.mask(tuple(cell) for cell in target)
+        self.jumps = self._compile_jumps()
+        self.move_flips = {move: flip for _, _, flip, move in self.jumps}
+        self.symmetries = self._compile_symmetries()
+        self.num_bytes = (len(self.holes) + 7) // 8
+        self.symmetry_tables = self._compile_symmetry_tables()
+        self.class_masks = self._compile_class_masks()
+
+    @classmethod
+    def from_spec(cls, name, spec):
+        return cls(name, spec['layout'], spec.get('lattice', 'square'), spec.get('target'))
+
+    def mask(self, cells):
+        bits = 0
+        for cell in cells:
+            if cell not in self.index:
+                raise ValueError(f"{cell} is not a hole of the {self.name} board")
+            bits |= 1 << self.index[cell]
+        return bits
+
+    def _compile_jumps(self):
+        jumps = []
+        for r, c in self.holes:
+            for dr, dc in self.directions:
+                for sign in (-1, 1):
+                    over = (r + sign * dr, c + sign * dc)
+                    to = (r + 2 * sign * dr, c + 2 * sign * dc)
+                    if over in self.index and to in self.index:
+                        need = (1 << self.index[(r, c)]) | (1 << self.index[over])
+                        to_mask = 1 << self.index[to]
+                        jumps.append((need, to_mask, need | to_mask, (r, c) + to))
+        return jumps
+
+    def _lattice_maps(self):
+        # Integer matrices with entries in {-1, 0, 1} that permute the step
+        # directions up to sign: the point symmetries of the lattice
+        steps = {d for dr, dc in self.directions for d in ((dr, dc), (-dr, -dc))}
+        values = (-1, 0, 1)
+        for a in values:
+            for b in values:
+                for c in values:
+                    for d in values:
+                        if a * d - b * c in (1, -1) and {(a * r + b * s, c * r + d * s) for r, s in steps} == steps:
+                            yield a, b, c, d
+
+    def _compile_symmetries(self):
+        """Permutations of hole indices that map the board and target onto themselves."""
+        holes = set(self.holes)
+        min_r = min(r for r, _ in self.holes)
+        min_c = min(c for _, c in self.holes)
+        symmetries = []
+        for a, b, c, d in self._lattice_maps():
+            image = [(a * r + b * s, c * r + d * s) for r, s in self.holes]
+            shift_r = min_r - min(r for r, _ in image)
+            shift_c = min_c - min(s for _, s in image)
+            image = [(r + shift_r, s + shift_c) for r, s in image]
+            if set(image) != holes:
+                continue
+            permutation = [self.index[cell] for cell in image]
+            moved_target = 0
+            for k in range(len(self.holes)):
+                if self.target >> k & 1:
+                    moved_target |= 1 << permutation[k]
+            if moved_target == self.target and permutation not in symmetries:
+                symmetries.append(permutation)
+        # identity first, so transform(bits, 0) is the position itself
+        identity = list(range(len(self.holes)))
+        symmetries.sort(key=lambda permutation: permutation != identity)
+        return symmetries
+
+    def _compile_symmetry_tables(self):
+        tables = []
+        for permutation in self.symmetries:
+            per_byte = []
+            for b in range(self.num_bytes):
+                table = [0] * 256
+                for value in range(256):
+                    image = 0
+                    for bit in range(8):
+                        k = 8 * b + bit
+                        if value >> bit & 1 and k < len(self.holes):
+                            image |= 1 << permutation[k]
+                    table[value] = image
+                per_byte.append(table)
+            tables.append(per_byte)
+        return tables
+
+    def _compile_class_masks(self):
+        forms = []
+        for x in range(3):
+            for y in range(3):
+                if all((x * dr + y * dc) % 3 for dr, dc in self.directions):
+                    if ((2 * x) % 3, (2 * y) % 3) not in forms:
+                        forms.append((x, y))
+        return [[self.mask(cell for cell in self.holes if (x * cell[0] + y * cell[1]) % 3 == residue)
+                 for residue in range(3)] for x, y in forms]
+
+    def transform(self, bits, symmetry):
+        """Image of a position under self.symmetries[symmetry]."""
+        image = 0
+        for table in self.symmetry_tables[symmetry]:
+            image |= table[bits & 0xFF]
+            bits >>= 8
+        return image
+
+    def canonical(self, bits):
+        """Smallest of the symmetric images of a position."""
+        chunks = []
+        for _ in range(self.num_bytes):
+            chunks.append(bits & 0xFF)
+            bits >>= 8
+        best = None
+        for tables in self.symmetry_tables:
+            image = 0
+            for table, chunk in zip(tables, chunks):
+                image |= table[chunk]
+            if best is None or image < best:
+                best = image
+        return best
+
+    def position_class(self, bits):
+        parities = []
+        for masks in self.class_masks:
+            counts = [(bits & mask).bit_count() & 1 for mask in masks]
+            parities.extend((counts[0] ^ counts[1], counts[1] ^ counts[2]))
+        return tuple(parities)
+
+    def fingerprint(self):
+        """Checksum of the holes and lattice, to tag files of positions."""
+        return zlib.crc32(repr((self.lattice, self.holes)).encode())
+
+    def __repr__(self):
+        return f"Geometry({self.name!r}, {len(self.holes)} holes, {len(self.symmetries)} symmetries)"
+
+
+def load_geometries(path=BOARDS_FILE):
+    """Every board of a spec file, by name."""
+    with open(path) as f:
+        specs = json.load(f)
+    return {name: Geometry.from_spec(name, spec) for name, spec in specs.items()}
+
+
+def load_geometry(name, path=BOARDS_FILE, target=None):
+    """One board of a spec file, optionally with another list of target holes."""
+    with open(path) as f:
+        specs = json.load(f)
+    if name not in specs:
+        raise KeyError(f"no board named {name!r} in {path}")
+    spec = dict(specs[name])
+    if target is not None:
+        spec['target'] = target
+    return Geometry.from_spec(name, spec)
+
+
+ENGLISH = load_geometry('english')
+
+
+class BitBoard:
+    __slots__ = ('bits', 'geometry')
+
+    def __init__(self, bits=None, geometry=ENGLISH):
+        self.geometry = geometry
+        self.bits = geometry.start if bits is None else bits
+
+    @classmethod
+    def from_rows(cls, rows, geometry=ENGLISH):
+        """Board from a grid (list of lists) of 0/1, as the search scripts used."""
+        return cls(geometry.mask((r, c) for r, row in enumerate(rows) for c, value in enumerate(row) if value),
+                   geometry)
+
+    def to_rows(self):
+        rows = [[0] * self.geometry.cols for _ in range(self.geometry.rows)]
+        for k, (r, c) in enumerate(self.geometry.holes):
+            rows[r][c] = (self.bits >> k) & 1
+        return rows
+
+    def marbles(self):
+        return self.bits.bit_count()
+
+    def is_goal(self):
+        return self.bits == self.geometry.target
+
+    def moves(self):
+        """All legal jumps, in the order of the compiled table."""
+        bits = self.bits
+        return [move for need, to, _, move in self.geometry.jumps if bits & need == need and not bits & to]
+
+    def canonical(self):
+        return self.geometry.canonical(self.bits)
+
+    def apply(self, move):
+        return BitBoard(self.bits ^ self.geometry.move_flips[move], self.geometry)
+
+    def __eq__(self, other):
+        return isinstance(other, BitBoard) and self.geometry is other.geometry and self.bits == other.bits
+
+    def __hash__(self):
+        return hash(self.bits)
+
+    def __repr__(self):
+        return f"BitBoard({self.bits:#x}, {self.geometry.name})"
@@ -0,0 +1,101 @@
+import math
+
+from marble_board import ENGLISH
+
+# Pagoda-function pruning for marble solitaire.
+#
+# A pagoda function gives every hole a weight w such that for every jump
+# from a over b to c, w[a] + w[b] >= w[c]: no move can raise the total weight
+# of the marbles on the board. A position whose total is already below the
+# target's can therefore never reach it.
+#
+# The functions used are Conway's resource counts: w = sigma ** d with
+# sigma = (sqrt(5) - 1) / 2, where d is the distance of the hole from the
+# nearest target hole. Since sigma + sigma**2 = 1, the inequality holds with
+# equality for a jump straight towards the target and strictly otherwise, for
+# any distance that changes by at most one between neighbouring holes -- so
+# Manhattan, Chebyshev, row-only and column-only distances each give a
+# different valid function on the square lattice. Every candidate is still
+# checked against the board's jump table before it is used, and the default
+# set keeps only those that pass (Manhattan distance, for one, is not a
+# pagoda on the triangular lattice, where a diagonal step changes it by 2).
+
+SIGMA = (math.sqrt(5) - 1) / 2
+EPSILON = 1e-9
+
+METRICS = {
+    'manhattan': lambda dr, dc: abs(dr) + abs(dc),
+    'chebyshev': lambda dr, dc: max(abs(dr), abs(dc)),
+    'rows': lambda dr, dc: abs(dr),
+    'columns': lambda dr, dc: abs(dc),
+}
+
+
+def _holes(bits, geometry):
+    return [k for k in range(len(geometry.holes)) if bits >> k & 1]
+
+
+def resource_count(target=None, metric='manhattan', geometry=ENGLISH):
+    """Conway's resource count towards `target` under one of METRICS."""
+    if target is None:
+        target = geometry.target
+    distance = METRICS[metric]
+    targets = [geometry.holes[k] for k in _holes(target, geometry)]
+    return [SIGMA ** min(distance(r - tr, c - tc) for tr, tc in targets) for r, c in geometry.holes]
+
+
+def _jump_holes(move, geometry):
+    r, c, tr, tc = move
+    index = geometry.index
+    return index[(r, c)], index[((r + tr) // 2, (c + tc) // 2)], index[(tr, tc)]
+
+
+def is_pagoda(weights, geometry=ENGLISH):
+    """True if no jump of the board can increase the weighted marble count."""
+    for _, _, _, move in geometry.jumps:
+        a, b, c = _jump_holes(move, geometry)
+        if weights[a] + weights[b] < weights[c] - EPSILON:
+            return False
+    return True
+
+
+class PagodaPruner:
+    """Set of pagoda functions checked against one target.
+
+    Search code keeps a tuple of pagoda values per node: values(bits) for the
+    start, update(values, move) for each child, then hopeless(values), which
+    also counts the branches it cut in `pruned`.
+    """
+
+    def __init__(self, target=None, functions=None, geometry=ENGLISH):
+        if target is None:
+            target = geometry.target
+        if functions is None:
+            candidates = [resource_count(target, metric, geometry) for metric in METRICS]
+            functions = [weights for weights in candidates if is_pagoda(weights, geometry)]
+        for weights in functions:
+            if not is_pagoda(weights, geometry):
+                raise ValueError("weights are not a pagoda function for this board")
+        self.geometry = geometry
+        self.target = target
+        self.functions = functions
+        self.bounds = self.values(target)
+        self.deltas = {}
+        for _, _, _, move in geometry.jumps:
+            a, b, c = _jump_holes(move, geometry)
+            self.deltas[move] = tuple(w[c] - w[a] - w[b] for w in functions)
+        self.pruned = 0
+
+    def values(self, bits):
+        holes = _holes(bits, self.geometry)
+        return tuple(sum(w[k] for k in holes) for w in self.functions)
+
+    def update(self, values, move):
+        return tuple(value + delta for value, delta in zip(values, self.deltas[move]))
+
+    def hopeless(self, values):
+        for value, bound in zip(values, self.bounds):
+            if value < bound - EPSILON:
+                self.pruned += 1
+                return True
+        return False
@@ -0,0 +1,270 @@
+import argparse
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import Event, shared_memory
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from common.stats import SearchStats
+from marble_board import BOARDS_FILE, ENGLISH, BitBoard, load_geometry
+from marble_dfs import DeadPositions, parse_holes, solve
+from marble_pagoda import PagodaPruner
+
+# Parallel subtree search for marble solitaire.
+#
+# The first `plies` jumps are expanded breadth-first in the parent, keeping
+# one position per symmetry class, and every position left is the root of a
+# subtree handed to a process pool, where it is searched by the depth-first
+# solver of marble_dfs.py. The subtrees overlap heavily -- the same position
+# is reached by many orders of the same jumps -- so workers share what they
+# prove: a direct-mapped table of dead canonical positions in shared memory,
+# one uint64 per slot, 0 for an empty slot. A new key simply overwrites the
+# slot it hashes to, so the table is a hint that may forget a position but
+# never holds one that was not proven dead; each worker also keeps its own
+# exact DeadPositions. Slots are aligned 8-byte words, so a reader sees
+# either the old or the new key, never a mix.
+#
+# The first worker to reach the target sets a shared event; the others poll
+# it (see solve()) and return, and subtrees not yet started are cancelled.
+
+# Fibonacci hashing multiplier for the slot of a key
+_HASH = 0x9E3779B97F4A7C15
+_MASK64 = (1 << 64) - 1
+
+
+class SharedDeadHints:
+    """Lossy table of dead canonical positions in a shared memory block."""
+
+    def __init__(self, block, table_bits, owner=False):
+        self.block = block
+        self.table_bits = table_bits
+        self.owner = owner
+        self.slots = block.buf.cast('Q')
+
+    @classmethod
+    def create(cls, table_bits=22):
+        block = shared_memory.SharedMemory(create=True, size=8 << table_bits)
+        block.buf[:] = bytes(8 << table_bits)
+        return cls(block, table_bits, owner=True)
+
+    @classmethod
+    def attach(cls, name, table_bits):
+        return cls(shared_memory.SharedMemory(name=name), table_bits)
+
+    def handle(self):
+        """Arguments for attach() in another process."""
+        return (self.block.name, self.table_bits)
+
+    def _slot(self, key):
+        return ((key * _HASH) & _MASK64) >> (64 - self.table_bits)
+
+    def add(self, key):
+        self.slots[self._slot(key)] = key
+
+    def __contains__(self, key):
+        return self.slots[self._slot(key)] == key
+
+    def __len__(self):
+        return sum(1 for key in self.slots if key)
+
+    def close(self):
+        self.slots.release()
+        self.block.close()
+        if self.owner:
+            self.block.unlink()
+
+
+class HintedDeadPositions(DeadPositions):
+    """A worker's DeadPositions, also reading and feeding the shared hints."""
+
+    def __init__(self, geometry, hints):
+        super().__init__(geometry)
+        self.hints = hints
+
+    def add(self, key):
+        self.keys.add(key)
+        self.hints.add(key)
+
+    def __contains__(self, key):
+        return key in self.keys or key in self.hints
+
+
+def expand_frontier(bits, geometry, plies, pagoda=None):
+    """Positions `plies` jumps after `bits`, one per symmetry class, as (bits, moves).
+
+    Stops early, returning only the target, if it is reached on the way.
+    """
+    canonical = geometry.canonical
+    level = [(bits, [])]
+    for _ in range(plies):
+        children = {}
+        for bits, path in level:
+            if bits == geometry.target:
+                return [(bits, path)]
+            board = BitBoard(bits, geometry)
+            for move in board.moves():
+                child = bits ^ geometry.move_flips[move]
+                key = canonical(child)
+                if key in children:
+                    continue
+                if pagoda is not None and pagoda.hopeless(pagoda.values(child)):
+                    continue
+                children[key] = (child, path + [move])
+        level = list(children.values())
+    return level
+
+
+_geometry = None  # worker-side board, dead positions, stop event and pruner
+_dead = None
+_stop = None
+_pagoda = None
+
+
+def _init_worker(geometry, hints_handle, stop, pagoda):
+    global _geometry, _dead, _stop, _pagoda
+    _geometry = geometry
+    _dead = HintedDeadPositions(geometry, SharedDeadHints.attach(*hints_handle))
+    _stop = stop
+    _pagoda = pagoda
+
+
+def solve_subtree(bits):
+    """Search one subtree; returns (moves or None, its SearchStats, pagoda prunes)."""
+    stats = SearchStats('dfs')
+    pruned = _pagoda.pruned if _pagoda is not None else 0
+    path = solve(bits, _geometry, _dead, stats, _pagoda, _stop)
+    if path is not None:
+        _stop.set()
+    pruned = _pagoda.pruned - pruned if _pagoda is not None else 0
+    return path, stats, pruned
+
+
+def parallel_solve(bits=None, geometry=ENGLISH, plies=4, workers=None, table_bits=22, stats=None, pagoda=None):
+    """Moves from `bits` (default: the board's start) to its target, or None.
+
+    plies: jumps expanded in this process before the subtrees are shared out.
+    workers: worker processes (default: all cores).
+    table_bits: log2 of the number of slots of the shared dead-position table.
+    stats: optional common.stats.SearchStats. Node counts are summed over
+    all workers and the frontier peak is the deepest point reached; elapsed
+    is wall time, while successor and bookkeeping time are summed worker
+    time, reported next to their total as stats.extra['worker_time']. The
+    extra values also give the number of subtrees and how many were searched.
+    pagoda: optional marble_pagoda.PagodaPruner, copied to every worker.
+    """
+    if bits is None:
+        bits = geometry.start
+    if len(geometry.holes) > 64:
+        raise ValueError("the shared dead-position table holds boards of up to 64 holes")
+    if pagoda is not None and pagoda.target != geometry.target:
+        raise ValueError("pagoda functions were built for a different target")
+    workers = workers or os.cpu_count()
+    pruned = pagoda.pruned if pagoda is not None else 0
+    worker_pruned = 0
+    frontier = []
+    hints = None
+    solution = None
+    searched = 0
+    worker_time = 0.0
+    if stats is not None:
+        stats.start()
+    try:
+        if geometry.position_class(bits) != geometry.position_class(geometry.target):
+            return None
+        frontier = expand_frontier(bits, geometry, plies, pagoda)
+        if len(frontier) == 1 and frontier[0][0] == geometry.target:
+            return frontier[0][1]
+
+        hints = SharedDeadHints.create(table_bits)
+        stop = Event()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(geometry, hints.handle(), stop, pagoda)) as pool:
+            subtrees = iter(frontier)
+            pending = {}
+            exhausted = False
+            while pending or not exhausted:
+                while not exhausted and not stop.is_set() and len(pending) < 4 * workers:
+                    subtree = next(subtrees, None)
+                    if subtree is None:
+                        exhausted = True
+                        break
+                    pending[pool.submit(solve_subtree, subtree[0])] = subtree[1]
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    prefix = pending.pop(future)
+                    path, subtree_stats, subtree_pruned = future.result()
+                    searched += 1
+                    if stats is not None:
+                        stats.nodes_expanded += subtree_stats.nodes_expanded
+                        stats.nodes_generated += subtree_stats.nodes_generated
+                        stats.frontier_peak = max(stats.frontier_peak, plies + subtree_stats.frontier_peak)
+                        stats.successor_time += subtree_stats.successor_time
+                        worker_time += subtree_stats.elapsed
+                        worker_pruned += subtree_pruned
+                    if path is not None and solution is None:
+                        solution = prefix + path
+                if solution is not None:
+                    stop.set()
+                    for future in pending:
+                        future.cancel()
+                    exhausted = True
+                    pending = {future: prefix for future, prefix in pending.items() if not future.cancelled()}
+    finally:
+        if stats is not None:
+            stats.visited_size = len(hints) if hints is not None else 0
+            if pagoda is not None:
+                stats.extra['pagoda_pruned'] = pagoda.pruned - pruned + worker_pruned
+            stats.extra['subtrees'] = len(frontier)
+            stats.extra['subtrees_searched'] = searched
+            # the workers' time split does not add up to the wall time, so
+            # report it against their summed time (extra overrides as_dict)
+            stats.extra['worker_time'] = worker_time
+            stats.extra['bookkeeping_time'] = max(worker_time - stats.successor_time, 0.0)
+            stats.stop()
+        if hints is not None:
+            hints.close()
+    return solution
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel subtree marble solitaire solver")
+    parser.add_argument('--board', default='english', help="board name in the spec file")
+    parser.add_argument('--boards', default=BOARDS_FILE, help="board spec file (JSON)")
+    parser.add_argument('--empty', default=None,
+                        help="holes empty at the start as 'row:col,...' (default: from the layout)")
+    parser.add_argument('--target', default=None,
+                        help="holes that should keep a marble, as 'row:col,...' (default: from the spec)")
+    parser.add_argument('--plies', type=int, default=4, help="jumps expanded before splitting into subtrees")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--table-bits', type=int, default=22,
+                        help="log2 of the slots of the shared dead-position table")
+    parser.add_argument('--pagoda', action='store_true', help="prune with pagoda functions")
+    parser.add_argument('--stats', choices=['text', 'json'], default=None, help="print search statistics")
+    args = parser.parse_args()
+
+    target = parse_holes(args.target) if args.target else None
+    geometry = load_geometry(args.board, args.boards, target)
+    start = geometry.start if args.empty is None else geometry.full & ~geometry.mask(parse_holes(args.empty))
+    stats = SearchStats('parallel dfs') if args.stats else None
+    pagoda = PagodaPruner(geometry=geometry) if args.pagoda else None
+    solution = parallel_solve(start, geometry, args.plies, args.workers, args.table_bits, stats, pagoda)
+
+    if solution is None:
+        print("No solution found.")
+    else:
+        print(f"Solution found in {len(solution)} moves:")
+        board = BitBoard(start, geometry)
+        for move in solution:
+            board = board.apply(move)
+            print(f"Move: {move}")
+            for row in board.to_rows():
+                print(" ".join(str(x) for x in row))
+            print()
+    if stats is not None:
+        print(stats.report(args.stats))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import heapq
+from collections import deque
+
+# Generic uninformed search over hashable states.
+#
+# Every search keeps a single parent map (state -> parent state) instead of
+# carrying a copy of the path in each frontier entry, so memory per generated
+# state is O(1) and the path is only rebuilt once the goal has been reached.
+# Each search also accepts an optional common.stats.SearchStats.
+
+
+def reconstruct_path(parents, state):
+    """Walk the parent map back from `state` and return the path root-first."""
+    path = []
+    while state is not None:
+        path.append(state)
+        state = parents[state]
+    path.reverse()
+    return path
+
+
+def _successors(stats, get_successors, state, frontier_size, visited_size):
+    if stats is None:
+        return get_successors(state)
+    stats.expand(state, frontier_size, visited_size)
+    return stats.successors(get_successors, state)
+
+
+def bfs(start_state, get_successors, is_goal, stats=None):
+    """Breadth-first search; states are marked visited when pushed."""
+    if stats is not None:
+        stats.start()
+    try:
+        parents = {start_state: None}
+        if is_goal(start_state):
+            return [start_state]
+        queue = deque([start_state])
+        while queue:
+            state = queue.popleft()
+            for successor in _successors(stats, get_successors, state, len(queue) + 1, len(parents)):
+                if successor in parents:
+                    continue
+                parents[successor] = state
+                if is_goal(successor):
+                    return reconstruct_path(parents, successor)
+                queue.append(successor)
+        return None
+    finally:
+        if stats is not None:
+            stats.stop()
+
+
+def dfs(start_state, get_successors, is_goal, stats=None):
+    """Depth-first search; states are marked visited when pushed."""
+    if stats is not None:
+        stats.start()
+    try:
+        parents = {start_state: None}
+        stack = [start_state]
+        while stack:
+            state = stack.pop()
+            if is_goal(state):
+                return reconstruct_path(parents, state)
+            for successor in _successors(stats, get_successors, state, len(stack) + 1, len(parents)):
+                if successor in parents:
+                    continue
+                parents[successor] = state
+                stack.append(successor)
+        return None
+    finally:
+        if stats is not None:
+            stats.stop()
+
+
+def uniform_cost_search(start_state, get_successors, is_goal, step_cost=None, stats=None):
+    """Dijkstra-style search; `step_cost(state, successor)` defaults to 1.
+
+    A state's cost can still improve after it is first generated, so the
+    parent map is updated whenever a cheaper route is found and stale heap
+    entries are skipped on pop.
+    """
+    if step_cost is None:
+        step_cost = lambda state, successor: 1
+    if stats is not None:
+        stats.start()
+    try:
+        parents = {start_state: None}
+        best_cost = {start_state: 0}
+        closed = set()
+        counter = 0  # tie-breaker so states never need to be comparable
+        frontier = [(0, counter, start_state)]
+        while frontier:
+            cost, _, state = heapq.heappop(frontier)
+            if state in closed:
+                continue
+            closed.add(state)
+            if is_goal(state):
+                return reconstruct_path(parents, state)
+            for successor in _successors(stats, get_successors, state, len(frontier) + 1, len(closed)):
+                if successor in closed:
+                    continue
+                new_cost = cost + step_cost(state, successor)
+                if new_cost < best_cost.get(successor, float('inf')):
+                    best_cost[successor] = new_cost
+                    parents[successor] = state
+                    counter += 1
+                    heapq.heappush(frontier, (new_cost, counter, successor))
+        return None
+    finally:
+        if stats is not None:
+            stats.stop()
@@ -0,0 +1,91 @@
+import json
+import time
+
+# Counters and timers shared by the search loops.
+#
+# A search function takes an optional `stats` argument; when one is given it
+# calls expand() once per expanded node and routes successor generation
+# through successors(), which is timed separately so the report can split
+# the run into successor generation and everything else (queue/heap and
+# visited-set bookkeeping).
+
+
+class SearchStats:
+    def __init__(self, name='search', on_expand=None):
+        self.name = name
+        self.hooks = []
+        if on_expand is not None:
+            self.hooks.append(on_expand)
+        self.nodes_expanded = 0
+        self.nodes_generated = 0
+        self.frontier_peak = 0
+        self.visited_size = 0
+        self.successor_time = 0.0
+        self.elapsed = 0.0
+        self.extra = {}  # algorithm-specific values to include in the report
+        self._started = None
+
+    def add_hook(self, hook):
+        """Register hook(stats, state), called on every expansion."""
+        self.hooks.append(hook)
+
+    def start(self):
+        self._started = time.perf_counter()
+
+    def stop(self):
+        if self._started is not None:
+            self.elapsed += time.perf_counter() - self._started
+            self._started = None
+
+    def expand(self, state, frontier_size, visited_size):
+        self.nodes_expanded += 1
+        if frontier_size > self.frontier_peak:
+            self.frontier_peak = frontier_size
+        self.visited_size = visited_size
+        for hook in self.hooks:
+            hook(self, state)
+
+    def successors(self, get_successors, *args):
+        """Call get_successors(*args), timing it and counting its results."""
+        began = time.perf_counter()
+        result = get_successors(*args)
+        self.successor_time += time.perf_counter() - began
+        self.nodes_generated += len(result)
+        return result
+
+    @property
+    def expansions_per_second(self):
+        return self.nodes_expanded / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def bookkeeping_time(self):
+        return max(self.elapsed - self.successor_time, 0.0)
+
+    def as_dict(self):
+        result = {
+            'name': self.name,
+            'nodes_expanded': self.nodes_expanded,
+            'nodes_generated': self.nodes_generated,
+            'frontier_peak': self.frontier_peak,
+            'visited_size': self.visited_size,
+            'elapsed': self.elapsed,
+            'successor_time': self.successor_time,
+            'bookkeeping_time': self.bookkeeping_time,
+            'expansions_per_second': self.expansions_per_second,
+        }
+        result.update(self.extra)
+        return result
+
+    def report(self, format='text'):
+        """Summary of the run as aligned text or as a JSON object."""
+        values = self.as_dict()
+        if format == 'json':
+            return json.dumps(values)
+        lines = [f"{self.name} statistics:"]
+        for key, value in values.items():
+            if key == 'name':
+                continue
+            if isinstance(value, float):
+                value = f"{value:.6f}" if key.endswith('time') or key == 'elapsed' else f"{value:.1f}"
+            lines.append(f"  {key.replace('_', ' ')}: {value}")
+        return '\n'.join(lines)